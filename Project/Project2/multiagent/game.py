@@ -21,7 +21,7 @@
 # For more info, see http://inst.eecs.berkeley.edu/~cs188/sp09/pacman.html
 
 from util import *
-import time, os
+import time, os, random
 import traceback
 import sys
 
@@ -368,6 +368,36 @@ class Actions:
         return (x + dx, y + dy)
     getSuccessor = staticmethod(getSuccessor)
 
+class ZobristKeys:
+    """
+    Random keys for the features of a game state (an agent's configuration,
+    a ghost's scared timer, a food dot, a capsule), drawn the first time a
+    feature is looked up.  The Zobrist hash of a state is the XOR of the
+    keys of its features, so a move changes it with a few XORs instead of
+    hashing the whole board again.  Keys have 63 bits so they and their XORs
+    stay plain ints.
+    """
+    def __init__(self, seed=0):
+        self.random = random.Random(seed) # private, so agents drawing random numbers are not disturbed
+        self.keys = {}
+
+    def __getitem__(self, feature):
+        key = self.keys.get(feature)
+        if key == None:
+            key = self.keys[feature] = self.random.getrandbits(63)
+        return key
+
+    def agentKey(self, index, configuration, scaredTimer):
+        "The XOR of the keys of the configuration and scared timer of agent index"
+        key = 0
+        if configuration != None:
+            key = self[('agent', index, configuration.pos, configuration.direction)]
+        if scaredTimer > 0:
+            key ^= self[('scared', index, scaredTimer)]
+        return key
+
+zobristKeys = ZobristKeys()
+
 class GameStateData:
     """
 
@@ -377,12 +407,19 @@ class GameStateData:
         Generates a new data packet by copying information from its predecessor.
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
+            if prevState._foodOwned:
+                # moves made in place change that grid, so this copy needs its own
+                self.food = prevState.food.copy()
+            else:
+                self.food = prevState.food.shallowCopy()
             self.capsules = prevState.capsules[:]
             self.agentStates = self.copyAgentStates( prevState.agentStates )
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            self._numFood = prevState._numFood
+        else:
+            self._numFood = None # food dots left, counted when first asked for
 
         self._foodEaten = None
         self._foodAdded = None
@@ -391,6 +428,8 @@ class GameStateData:
         self._lose = False
         self._win = False
         self.scoreChange = 0
+        self._zobrist = None # Zobrist hash of everything but the score, see getZobristHash
+        self._foodOwned = False # whether food may be changed in place, see GameState.applyMove
 
     def deepCopy( self ):
         state = GameStateData( self )
@@ -400,6 +439,7 @@ class GameStateData:
         state._foodEaten = self._foodEaten
         state._foodAdded = self._foodAdded
         state._capsuleEaten = self._capsuleEaten
+        state._zobrist = self._zobrist
         return state
 
     def copyAgentStates( self, agentStates ):
@@ -424,13 +464,65 @@ class GameStateData:
         """
         Allows states to be keys of dictionaries.
         """
-        for i, state in enumerate( self.agentStates ):
-            try:
-                int(hash(state))
-            except TypeError, e:
-                print e
-                #hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113* hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575 )
+        return hash( (self.getZobristHash(), self.score) )
+
+    def getZobristHash( self ):
+        """
+        Returns the Zobrist hash of the agent states, food and capsules (see
+        ZobristKeys).  It is built from scratch the first time and kept;
+        successors made by GameState.generateSuccessor update their
+        predecessor's hash instead.
+        """
+        if self._zobrist == None:
+            h = 0
+            for index, agentState in enumerate( self.agentStates ):
+                h ^= zobristKeys.agentKey( index, agentState.configuration, agentState.scaredTimer )
+            for x, y in self.food.asList():
+                h ^= zobristKeys[('food', x, y)]
+            for x, y in self.capsules:
+                h ^= zobristKeys[('capsule', x, y)]
+            self._zobrist = h
+        return self._zobrist
+
+    def updateZobristHash( self, prevState ):
+        """
+        Sets the Zobrist hash from the hash of prevState, the data this one
+        was copied from before a single move changed it.  Only the agents
+        whose configuration or scared timer changed and the food or capsule
+        the move ate are looked at.
+        """
+        h = prevState.getZobristHash()
+        for index, agentState in enumerate( self.agentStates ):
+            prevAgentState = prevState.agentStates[index]
+            if agentState.configuration is not prevAgentState.configuration or \
+               agentState.scaredTimer != prevAgentState.scaredTimer:
+                h ^= zobristKeys.agentKey( index, prevAgentState.configuration, prevAgentState.scaredTimer ) ^ \
+                     zobristKeys.agentKey( index, agentState.configuration, agentState.scaredTimer )
+        self._zobrist = h ^ self._eatenZobristKey()
+
+    def updateZobristHashInPlace( self, prevHash, prevAgents ):
+        """
+        Like updateZobristHash, for a move made in place (see
+        GameState.applyMove).  prevHash is the hash before the move and
+        prevAgents lists (index, configuration, scaredTimer) from before the
+        move for every agent the move may have changed.
+        """
+        h = prevHash
+        for index, configuration, scaredTimer in prevAgents:
+            agentState = self.agentStates[index]
+            h ^= zobristKeys.agentKey( index, configuration, scaredTimer ) ^ \
+                 zobristKeys.agentKey( index, agentState.configuration, agentState.scaredTimer )
+        self._zobrist = h ^ self._eatenZobristKey()
+
+    def _eatenZobristKey( self ):
+        "The XOR of the keys of the food and capsule the last move ate or added"
+        h = 0
+        for position in [self._foodEaten, self._foodAdded]:
+            if position != None:
+                h ^= zobristKeys[('food',) + tuple( position )]
+        if self._capsuleEaten != None:
+            h ^= zobristKeys[('capsule',) + tuple( self._capsuleEaten )]
+        return h
 
     def __str__( self ):
         width, height = self.layout.width, self.layout.height
@@ -489,6 +581,7 @@ class GameStateData:
         Creates an initial game state from a layout array (see layout.py).
         """
         self.food = layout.food.copy()
+        self._numFood = self.food.count()
         #self.capsules = []
         self.capsules = layout.capsules[:]
         self.layout = layout
@@ -526,6 +619,7 @@ class Game:
         self.catchExceptions = catchExceptions
         self.moveHistory = []
         self.totalAgentTimes = [0 for agent in agents]
+        self.totalAgentMoves = [0 for agent in agents]
         self.totalAgentTimeWarnings = [0 for agent in agents]
         self.agentTimeout = False
         import cStringIO
@@ -537,6 +631,22 @@ class Game:
         else:
             return self.rules.getProgress(self)
 
+    # A move's share of the total time left assumes at least this many moves
+    # are left, and at least as many as the agent has made so far
+    MIN_MOVES_LEFT = 50
+
+    def getMoveTimeLimit( self, agentIndex, moveTime=0 ):
+        """
+        Returns the seconds agent agentIndex should spend on its move, after
+        moveTime seconds already spent on it: its share of the total time it
+        has left, spread over the moves it can still expect to make, and never
+        more than the rules allow before they warn it or time it out.
+        """
+        limit = min( self.rules.getMoveWarningTime( agentIndex ), self.rules.getMoveTimeout( agentIndex ) ) - moveTime
+        timeLeft = self.rules.getMaxTotalTime( agentIndex ) - self.totalAgentTimes[agentIndex] - moveTime
+        movesLeft = max( self.MIN_MOVES_LEFT, self.totalAgentMoves[agentIndex] )
+        return max( 0, min( limit, timeLeft / movesLeft ) )
+
     def _agentCrash( self, agentIndex, quiet=False):
         "Helper method for handling agent crashes"
         if not quiet: traceback.print_exc()
@@ -639,6 +749,10 @@ class Game:
             else:
                 observation = self.state.deepCopy()
 
+            # Tell agents that budget their own search how long this move may take
+            if 'setMoveTimeLimit' in dir( agent ):
+                agent.setMoveTimeLimit( self.getMoveTimeLimit( agentIndex, move_time ) )
+
             # Solicit an action
             action = None
             self.mute(agentIndex)
@@ -683,11 +797,15 @@ class Game:
                     self.unmute()
                     return
             else:
+                # not enforced, but agents that budget their time still need to know what they used
+                start_time = time.time()
                 action = agent.getAction(observation)
+                self.totalAgentTimes[agentIndex] += time.time() - start_time
             self.unmute()
 
             # Execute the action
             self.moveHistory.append( (agentIndex, action) )
+            self.totalAgentMoves[agentIndex] += 1
             if self.catchExceptions:
                 try:
                     self.state = self.state.generateSuccessor( agentIndex, action )
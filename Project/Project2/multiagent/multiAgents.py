@@ -14,7 +14,8 @@
 
 from util import manhattanDistance
 from game import Directions
-import random, util
+import random, util, time, gc
+from collections import OrderedDict
 
 from game import Agent
 
@@ -117,6 +118,77 @@ def scoreEvaluationFunction(currentGameState):
     """
     return currentGameState.getScore()
 
+class TranspositionTable:
+    """
+      A bounded table of search results for the game-tree agents, so a
+      position reached again (ghost moves in another order, Pacman walking
+      back) is not searched again.  Keys are (state hash, agent index,
+      remaining depth); an entry holds a flag saying whether the value is
+      EXACT, a LOWER bound or an UPPER bound, the value and the best move.
+
+      replacement='lru' drops the least recently used entry when the table
+      is full.  replacement='depth' keeps one entry per slot of a fixed
+      array and only lets a search at least as deep replace it.
+    """
+    EXACT, LOWER, UPPER = 'exact', 'lower', 'upper'
+
+    def __init__(self, size, replacement='lru'):
+        if replacement not in ['lru', 'depth']:
+            raise Exception('replacement must be lru or depth, not ' + str(replacement))
+        self.size = size
+        self.replacement = replacement
+        if replacement == 'lru':
+            self.entries = OrderedDict() # key -> (flag, value, move), least recently used first
+        else:
+            self.slots = [None] * size   # (key, flag, value, move) per slot
+        # Counters to tune the size with
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        "Returns the (flag, value, move) stored for key, or None"
+        self.probes += 1
+        if self.replacement == 'lru':
+            entry = self.entries.pop(key, None)
+            if entry == None: return None
+            self.entries[key] = entry # now the most recently used
+        else:
+            slot = self.slots[hash(key) % self.size]
+            if slot == None or slot[0] != key: return None
+            entry = slot[1:]
+        self.hits += 1
+        return entry
+
+    def store(self, key, flag, value, move):
+        self.stores += 1
+        if self.replacement == 'lru':
+            if key in self.entries:
+                del self.entries[key]
+            elif len(self.entries) >= self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self.entries[key] = (flag, value, move)
+        else:
+            index = hash(key) % self.size
+            slot = self.slots[index]
+            if slot != None and slot[0] != key:
+                if slot[0][2] > key[2]: return # keep the deeper search
+                self.evictions += 1
+            self.slots[index] = (key, flag, value, move)
+
+    def __len__(self):
+        if self.replacement == 'lru': return len(self.entries)
+        return len(self.slots) - self.slots.count(None)
+
+    def hitRate(self):
+        return float(self.hits) / max(self.probes, 1)
+
+    def __str__(self):
+        return '%d probes, %.1f%% hits, %d stores, %d of %d entries used, %d evicted' % (
+            self.probes, 100 * self.hitRate(), self.stores, len(self), self.size, self.evictions)
+
 class MultiAgentSearchAgent(Agent):
     """
       This class provides some common elements to all of your
@@ -132,10 +204,21 @@ class MultiAgentSearchAgent(Agent):
       is another abstract class.
     """
 
-    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2'):
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', ttSize = '0', ttReplacement = 'lru'):
         self.index = 0 # Pacman is always agent index 0
         self.evaluationFunction = util.lookup(evalFn, globals())
         self.depth = int(depth)
+        # ttSize > 0 keeps up to that many search results across moves, see TranspositionTable
+        self.table = None
+        if int(ttSize) > 0:
+            self.table = TranspositionTable(int(ttSize), ttReplacement)
+
+    def tableKey(self, gameState, agentIndex, depth):
+        return (hash(gameState), agentIndex, self.depth - depth)
+
+    def final(self, state):
+        if self.table != None:
+            print('[TranspositionTable] ' + str(self.table))
 
 class MinimaxAgent(MultiAgentSearchAgent):
     """
@@ -170,13 +253,22 @@ class MinimaxAgent(MultiAgentSearchAgent):
        # Evaluate if explored all depths or if gamestate = winstate or losestate
         if  depth == self.depth or  gameState.isLose() or gameState.isWin() :
             return self.evaluationFunction(gameState)
+
+        # a position searched before to the same depth has the same value
+        if self.table != None:
+            key = self.tableKey(gameState, agentIndex, depth)
+            entry = self.table.lookup(key)
+            if entry != None: return entry[1]
         
         #As given in the description, pacman is agent 0, therefore maximize it
-        elif agentIndex == 0:
-            return self.maxValue(gameState,agentIndex, depth)
+        if agentIndex == 0:
+            value = self.maxValue(gameState,agentIndex, depth)
         # if the agent is not equal to zero then  it is a ghost, therefore minimize it.
         else:
-            return self.minValue(gameState,agentIndex, depth)
+            value = self.minValue(gameState,agentIndex, depth)
+        if self.table != None:
+            self.table.store(key, TranspositionTable.EXACT, value, self.best_action)
+        return value
 
     def minValue(self,gameState, agentIndex, depth):
         # min_node_list has a list of the nodes distances with respective actions
@@ -224,44 +316,275 @@ class MinimaxAgent(MultiAgentSearchAgent):
 
     
 
+class SearchTimeout(Exception):
+    """
+      Raised inside a search that ran past its deadline.
+    """
+    pass
+
 class AlphaBetaAgent(MultiAgentSearchAgent):
     """
       Your minimax agent with alpha-beta pruning (question 3)
+
+      iterative=1 makes it deepen one ply of every agent at a time for as
+      long as the move's time budget allows, see iterativeDeepening.  The
+      budget is the move's share of the time the game gives Pacman (see
+      Game.getMoveTimeLimit), or moveTime seconds if that is less.  Without
+      a budget it deepens up to depth.  timedGames.py checks that it keeps
+      to its budgets.
+
+      ordering=1 searches the moves most likely to cause a cutoff first, see
+      orderActions, so more of the tree gets pruned.
+
+      inPlace=1 walks the tree on one copy of the state with applyMove and
+      undoMove instead of generating a new state per node, see
+      successorValue.  States made that way are not added to
+      GameState.explored, which the autograder counts.
     """
+    # Fractions of the budget: no new iteration is started after the first,
+    # and a running one is given up at the second
+    NEW_ITERATION_FRACTION = 0.4
+    DEADLINE_FRACTION = 0.8
+
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', ttSize = '0', ttReplacement = 'lru',
+                 iterative = '0', moveTime = None, ordering = '0', inPlace = '0'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, ttSize, ttReplacement)
+        if iterative not in ['0', '1']:
+            raise Exception('iterative must be 0 or 1, not ' + str(iterative))
+        if ordering not in ['0', '1']:
+            raise Exception('ordering must be 0 or 1, not ' + str(ordering))
+        if inPlace not in ['0', '1']:
+            raise Exception('inPlace must be 0 or 1, not ' + str(inPlace))
+        self.iterative = iterative == '1'
+        self.ordering = ordering == '1'
+        self.inPlace = inPlace == '1'
+        self.hashMove = None      # best move the transposition table holds for the node being expanded
+        self.killers = {}         # ply -> the last two moves that caused a cutoff there
+        self.history = {}         # (agent index, position, action) -> how much it caused cutoffs
+        self.cutoffs = 0
+        self.firstMoveCutoffs = 0 # cutoffs caused by the first move searched
+        self.moveTime = None
+        if moveTime != None: self.moveTime = float(moveTime)
+        self.moveTimeLimit = None # set by the game before every move
+        self.deadline = None      # time at which a running search is given up
+        self.pv = []              # principal variation of the last finished iteration
+        self.pvTable = {}         # ply -> principal variation below it, in the running iteration
+        self.followPV = False     # whether the search is still on the path of self.pv
+        self.depthsReached = []   # deepest finished iteration of every move
+        self.moveTimes = []       # (budget, seconds taken) of every move with a budget
+
+    def setMoveTimeLimit(self, seconds):
+        "Called by the game before every move with the seconds the move may take"
+        self.moveTimeLimit = seconds
+
+    def getMoveBudget(self):
+        "The seconds this move may take, or None if there is no limit"
+        limits = [limit for limit in [self.moveTime, self.moveTimeLimit] if limit != None]
+        if not limits: return None
+        return min(limits)
 
     def getAction(self, gameState):
         """
           Returns the minimax action using self.depth and self.evaluationFunction
         """
         "*** YOUR CODE HERE ***"
+        if self.ordering:
+            # killers are per ply below the root, old history counts less
+            self.killers = {}
+            for key in self.history:
+                self.history[key] /= 2
+        if self.inPlace:
+            # the copy moves are made on; one given up at a deadline is simply dropped
+            gameState = gameState.deepCopy()
+        if self.iterative:
+            return self.iterativeDeepening(gameState)
 
          # intialiize  depth, alpha &  beta with default values.
         alpha_beta_best_Action = self.maxValue(gameState, 0, 0, float("-inf"), float("inf"))
         #To optimize the value for pacman, return the best possible action
         return self.alpha_beta_best_Action
 
+    def iterativeDeepening(self, gameState):
+        """
+          Searches to depth 1, 2, 3 and so on, and returns the best move of
+          the deepest search that finished.  Each search first follows the
+          principal variation of the one before.  No new search starts once
+          NEW_ITERATION_FRACTION of the budget is used, the running one is
+          given up at DEADLINE_FRACTION, and none goes deeper once a search
+          reached no depth limit at all.  The first search always finishes.
+
+          While a budget runs the garbage collector is off: the search only
+          makes trees of states, which are freed as it backs out of them, and
+          a collection of the whole heap can take longer than the budget.
+        """
+        start = time.time()
+        budget = self.getMoveBudget()
+        maxDepth = self.depth
+        self.pv = []
+        depth = 1
+        collecting = gc.isenabled()
+        if budget != None: gc.disable()
+        try:
+            while budget != None or depth <= maxDepth:
+                self.depth = depth
+                if depth > 1 and budget != None:
+                    self.deadline = start + budget * self.DEADLINE_FRACTION
+                self.depthCutoff = False
+                self.followPV = True
+                self.pvTable = {}
+                self.maxValue(gameState, 0, 0, float("-inf"), float("inf"))
+                bestAction = self.alpha_beta_best_Action
+                self.pv = self.pvTable.get(0, [])
+                reached = depth
+                if not self.depthCutoff: break # a deeper search would find the same
+                if budget != None and time.time() - start > budget * self.NEW_ITERATION_FRACTION: break
+                depth += 1
+        except SearchTimeout:
+            pass
+        finally:
+            self.depth = maxDepth
+            self.deadline = None
+            self.followPV = False
+            if collecting: gc.enable()
+        self.depthsReached.append(reached)
+        if budget != None: self.moveTimes.append((budget, time.time() - start))
+        return bestAction
+
+    def orderActions(self, gameState, agentIndex, depth, actions):
+        """
+          Returns actions in the order to search them.  While the search is
+          on the path of the previous iteration's principal variation, its
+          move comes first.  With ordering on, the hash move from the
+          transposition table comes next, then the killer moves of this ply,
+          then the rest by history score.  Otherwise actions are left in the
+          order given.
+        """
+        hashMove = self.hashMove
+        self.hashMove = None
+        if not self.followPV and not self.ordering: return actions
+        ply = depth * gameState.getNumAgents() + agentIndex
+        first = [] # moves searched before the rest, best guess first
+        if self.followPV:
+            self.followPV = False
+            if ply < len(self.pv) and self.pv[ply] in actions:
+                self.followPV = True # the child searched first is on the path too
+                first.append(self.pv[ply])
+        if self.ordering:
+            for move in [hashMove] + self.killers.get(ply, []):
+                if move in actions and move not in first:
+                    first.append(move)
+        rest = [action for action in actions if action not in first]
+        if self.ordering:
+            position = self.getAgentPosition(gameState, agentIndex)
+            # a stable sort, so moves without history keep their order
+            rest.sort(key=lambda action: -self.history.get((agentIndex, position, action), 0))
+        return first + rest
+
+    def getAgentPosition(self, gameState, agentIndex):
+        if agentIndex == 0:
+            return gameState.getPacmanPosition()
+        return gameState.getGhostPosition(agentIndex)
+
+    def recordCutoff(self, gameState, agentIndex, depth, action, firstMove):
+        """
+          Remembers that action caused a cutoff: as a killer move for this ply
+          and in the history score of the agent making it from its position,
+          weighted by the remaining depth.
+        """
+        if not self.ordering: return
+        self.cutoffs += 1
+        if firstMove: self.firstMoveCutoffs += 1
+        ply = depth * gameState.getNumAgents() + agentIndex
+        killers = self.killers.setdefault(ply, [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+        key = (agentIndex, self.getAgentPosition(gameState, agentIndex), action)
+        self.history[key] = self.history.get(key, 0) + (self.depth - depth) ** 2
+
+    def updatePV(self, gameState, agentIndex, depth, action, bestAction):
+        "Makes action and the principal variation below it the one of this node, if action is the best so far"
+        if self.iterative and action == bestAction:
+            ply = depth * gameState.getNumAgents() + agentIndex
+            self.pvTable[ply] = [action] + self.pvTable.get(ply + 1, [])
+
+    def final(self, state):
+        MultiAgentSearchAgent.final(self, state)
+        if self.ordering and self.cutoffs:
+            print('[AlphaBetaAgent] %.1f%% of %d cutoffs came from the first move searched' % (
+                100.0 * self.firstMoveCutoffs / self.cutoffs, self.cutoffs))
+        if self.iterative and self.depthsReached:
+            print('[AlphaBetaAgent] searched to depth %.1f on average, %d at most' % (
+                float(sum(self.depthsReached)) / len(self.depthsReached), max(self.depthsReached)))
+        if self.moveTimes:
+            over = len([1 for (budget, seconds) in self.moveTimes if seconds > budget])
+            print('[AlphaBetaAgent] %d of %d moves went over their time budget' % (over, len(self.moveTimes)))
+
+    def successorValue(self, gameState, agentIndex, action, nextAgent, depth, alpha, beta):
+        """
+          Returns the alphaBeta value of the state after agentIndex takes action,
+          with nextAgent to move.  With inPlace on the move is made on gameState
+          itself and taken back before returning.
+        """
+        if not self.inPlace:
+            return self.alphaBeta(gameState.generateSuccessor(agentIndex, action), nextAgent, depth, alpha, beta)
+        gameState.applyMove(agentIndex, action)
+        value = self.alphaBeta(gameState, nextAgent, depth, alpha, beta)
+        gameState.undoMove()
+        return value
+
     def alphaBeta(self, gameState, agentIndex, depth,alpha, beta):
+        if self.iterative:
+            if self.deadline != None and time.time() > self.deadline: raise SearchTimeout()
+            # nothing below this node is on the principal variation until it finds a best move
+            self.pvTable[depth * gameState.getNumAgents() + agentIndex] = []
         # Evaluate if explored all depths or if gamestate = winstate or losestate
         if  depth == self.depth or  gameState.isLose() or gameState.isWin() :
+            if depth == self.depth and not (gameState.isLose() or gameState.isWin()):
+                self.depthCutoff = True
+            self.followPV = False
             return self.evaluationFunction(gameState)
+
+        # a stored bound is only good enough if it prunes the same way the search would
+        if self.table != None:
+            key = self.tableKey(gameState, agentIndex, depth)
+            entry = self.table.lookup(key)
+            if entry != None:
+                (flag, value, move) = entry
+                if flag == TranspositionTable.EXACT or \
+                   (flag == TranspositionTable.LOWER and value > beta) or \
+                   (flag == TranspositionTable.UPPER and value < alpha):
+                    self.followPV = False
+                    self.depthCutoff = True # the stored search may have stopped at its depth
+                    return value
+                self.hashMove = move
         
         #As given in the description, pacman is agent 0, therefore maximize it
-        elif agentIndex == 0:
-            return self.maxValue(gameState, agentIndex, depth,alpha, beta)
+        if agentIndex == 0:
+            value = self.maxValue(gameState, agentIndex, depth,alpha, beta)
+            move = self.alpha_beta_best_Action
         # if the agent is not equal to zero then  it is a ghost, therefore minimize it.
         else:
-            return self.minValue(gameState, agentIndex, depth,alpha,beta)
+            value = self.minValue(gameState, agentIndex, depth,alpha,beta)
+            if agentIndex + 1 == gameState.getNumAgents(): move = self.alpha_beta_best_Action
+            else: move = self.alpha_beta_best_Action_2
+        if self.table != None:
+            # a pruned search only returns a bound: an upper one if it stopped
+            # below alpha, a lower one if it stopped above beta
+            if value < alpha: flag = TranspositionTable.UPPER
+            elif value > beta: flag = TranspositionTable.LOWER
+            else: flag = TranspositionTable.EXACT
+            self.table.store(key, flag, value, move)
+        return value
 
     def minValue(self, gameState, agentIndex, depth,alpha, beta):
-        # min_node_list has a list of the nodes distances with respective actions
-        min_node_list= []
-
+        # min_node has the smallest (value, action) pair so far; ties go to the
+        # smaller action, just as min over a list of all the pairs would
         # setting the min score to the largest num possible, state as Directions.STOP 
-        initial_values = (float("inf"), Directions.STOP) 
-        min_node_list.append(initial_values)
+        min_node = (float("inf"), Directions.STOP)
 
         # retrieving all possible legal actions from the current state
-        next_states = gameState.getLegalActions(agentIndex)
+        next_states = self.orderActions(gameState, agentIndex, depth, gameState.getLegalActions(agentIndex))
         for state in next_states:
             num_agents = gameState.getNumAgents()
             # condition for the lastghost
@@ -269,19 +592,23 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
             if agentIndex + 1 == num_agents:  # exploring the lastghost
                 # find the pacman agent min value of the successor states
 
-                min_score = self.alphaBeta(gameState.generateSuccessor(agentIndex, state), 0, depth + 1,alpha, beta)
-                min_node_list.append((min_score, state))
-                (self.alpha_beta_min_value, self.alpha_beta_best_Action) = min(min_node_list)
+                min_score = self.successorValue(gameState, agentIndex, state, 0, depth + 1, alpha, beta)
+                min_node = min(min_node, (min_score, state))
+                (self.alpha_beta_min_value, self.alpha_beta_best_Action) = min_node
+                self.updatePV(gameState, agentIndex, depth, state, self.alpha_beta_best_Action)
             else:  # exploring the  remaning ghosts except the last ghost
-                min_score = self.alphaBeta(gameState.generateSuccessor(agentIndex, state), agentIndex + 1, depth,alpha , beta)
-                min_node_list.append((min_score, state))
+                min_score = self.successorValue(gameState, agentIndex, state, agentIndex + 1, depth, alpha, beta)
+                min_node = min(min_node, (min_score, state))
 
-                (self.alpha_beta_min_value, self.alpha_beta_best_Action_2) = min(min_node_list)
+                (self.alpha_beta_min_value, self.alpha_beta_best_Action_2) = min_node
+                self.updatePV(gameState, agentIndex, depth, state, self.alpha_beta_best_Action_2)
 
 
             # If alpha_beta_min_value < alpha, we can return the alpha_beta_min_value without any need to check the childnodes
             #  Following the alpha-beta pruning to reduce the amount of computation needed, set beta value to min of alpha_beta_min_value and beta .
-            if (self.alpha_beta_min_value < alpha): return self.alpha_beta_min_value
+            if (self.alpha_beta_min_value < alpha):
+                self.recordCutoff(gameState, agentIndex, depth, state, state == next_states[0])
+                return self.alpha_beta_min_value
             beta = min(beta, self.alpha_beta_min_value)
 
         return self.alpha_beta_min_value
@@ -289,22 +616,22 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
   
 
     def maxValue(self, gameState, agentIndex, depth, alpha, beta):
-        #list to keep track of nodesdistances and their actions
-        max_node_list = []
-        initial_values = (float("-inf"),Directions.STOP)
-
-        max_node_list.append(initial_values)
+        #max_node keeps the largest (value, action) pair so far; ties go to the
+        #larger action, just as max over a list of all the pairs would
+        max_node = (float("-inf"),Directions.STOP)
 
         # retrieving all possible legal actions from the current state
-        next_states = gameState.getLegalActions(agentIndex)
+        next_states = self.orderActions(gameState, agentIndex, depth, gameState.getLegalActions(agentIndex))
         for state in next_states:
             # calculate the cost it takes to reach the successor
-            max_score = self.alphaBeta(gameState.generateSuccessor(agentIndex, state), 1, depth,alpha,beta)
-            max_node_list.append((max_score, state))
-            (self.alpha_beta_max_value, self.alpha_beta_best_Action) = max(max_node_list)
+            max_score = self.successorValue(gameState, agentIndex, state, 1, depth, alpha, beta)
+            max_node = max(max_node, (max_score, state))
+            (self.alpha_beta_max_value, self.alpha_beta_best_Action) = max_node
+            self.updatePV(gameState, agentIndex, depth, state, self.alpha_beta_best_Action)
 
             # If alpha_beta_max_value > alpha, we can return the alpha_beta_max_value without any need to check the childnodes
             if(self.alpha_beta_max_value > beta):
+                self.recordCutoff(gameState, agentIndex, depth, state, state == next_states[0])
                 return self.alpha_beta_max_value
 
             #  Following the alpha-beta pruning to reduce the amount of computation needed, set beta value to min of alpha_beta_min_value and beta .
@@ -348,16 +675,24 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
 				if(not len(next_states) ):
 					gameState = self.evaluationFunction(gameState)
 					return(gameState)
+				#a position searched before to the same depth has the same value
+				if self.table != None:
+					key = self.tableKey(gameState, agentIndex, depth)
+					entry = self.table.lookup(key)
+					if entry != None: return entry[1]
 					#finding all the mini max values
 				mini_max = (expectiMax(gameState.generateSuccessor(agentIndex, i), agentIndex + 1, depth) for i in next_states)  
 				#if the agent is pacman then calculate the max value of minimax 
-				if agentIndex == 0:  return max(mini_max)
+				if agentIndex == 0:  value = max(mini_max)
 				else:   # if not agent,  find the expectimax value by storing all the possible moves in a set, taking sum, finding ratio
 					mini_max_set =  set(mini_max)
 					mini_max_sum =  sum(mini_max_set)     
 					length=len(mini_max_set)    
 					ratio = (mini_max_sum/length)  
-					return(ratio)
+					value = ratio
+				if self.table != None:
+					self.table.store(key, TranspositionTable.EXACT, value, None)
+				return(value)
 
         action_highest_min_max = max(gameState.getLegalActions(0), key=lambda x: expectiMax(gameState.generateSuccessor(0, x), 1, 1))
         # return the action with highest minimax value
@@ -43,6 +43,7 @@ from game import GameStateData
 from game import Game
 from game import Directions
 from game import Actions
+from game import Configuration
 from util import nearestPoint
 from util import manhattanDistance
 import util, layout
@@ -120,10 +121,96 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
+        state.data.updateZobristHash( self.data )
         GameState.explored.add(self)
         GameState.explored.add(state)
         return state
 
+    def applyMove( self, agentIndex, action ):
+        """
+        Makes the move in place: this state becomes what
+        generateSuccessor( agentIndex, action ) would return, without
+        copying anything, and the move is pushed on an undo stack.
+        undoMove takes moves back, last one first.  A search can walk the
+        game tree this way with a single state instead of one per node.
+
+        While moves are applied the state's hash changes, so keep it out of
+        sets and dictionaries, and the grid from getFood changes with it.
+        States made in place are not added to GameState.explored.
+        """
+        if self.isWin() or self.isLose(): raise Exception('Can\'t apply a move to a terminal state.')
+        data = self.data
+        if not data._foodOwned:
+            # Copy on the first move made in place; until now the grid may be
+            # shared with the states this one was made from
+            data.food = data.food.copy()
+            data._foodOwned = True
+        agentStates = data.agentStates
+
+        # The agents the move may change: the one moving, and every ghost
+        # if Pacman may eat a capsule or run into a ghost
+        agents = [agentIndex]
+        capsuleIndex = None
+        if agentIndex == 0:
+            target = Actions.getSuccessor( self.getPacmanPosition(), action )
+            if target in data.capsules:
+                capsuleIndex = data.capsules.index( target )
+            if capsuleIndex != None or [ghostState for ghostState in agentStates[1:]
+                                        if GhostRules.canKill( target, ghostState.getPosition() )]:
+                agents = range( len( agentStates ) )
+        prevAgents = [(index, agentStates[index].configuration, agentStates[index].scaredTimer) for index in agents]
+        prevHash = data.getZobristHash()
+        undoStack = getattr( self, '_undoStack', None )
+        if undoStack == None:
+            # made on the first move in place, so generateSuccessor does not pay for it
+            undoStack = self._undoStack = []
+        undoStack.append( (agentIndex, prevAgents, capsuleIndex, data._eaten,
+                                 data.score, data.scoreChange, data._win, data._lose,
+                                 data._foodEaten, data._capsuleEaten, data._agentMoved, prevHash) )
+
+        # The same steps as generateSuccessor
+        data._foodEaten = None
+        data._capsuleEaten = None
+        data.scoreChange = 0
+        if agentIndex == 0:  # Pacman is moving
+            data._eaten = [False for i in range(self.getNumAgents())]
+            PacmanRules.applyAction( self, action )
+            data.scoreChange += -TIME_PENALTY # Penalty for waiting around
+        else:                # A ghost is moving
+            GhostRules.applyAction( self, action, agentIndex )
+            GhostRules.decrementTimer( agentStates[agentIndex] )
+        GhostRules.checkDeath( self, agentIndex )
+        data._agentMoved = agentIndex
+        data.score += data.scoreChange
+        data.updateZobristHashInPlace( prevHash, prevAgents )
+
+    def undoMove( self ):
+        """
+        Takes back the last move made with applyMove.
+        """
+        if not getattr( self, '_undoStack', None ): raise Exception('There is no move to undo.')
+        (agentIndex, prevAgents, capsuleIndex, eaten, score, scoreChange, win, lose,
+         foodEaten, capsuleEaten, agentMoved, prevHash) = self._undoStack.pop()
+        data = self.data
+        if data._foodEaten != None:
+            x, y = data._foodEaten
+            data.food[x][y] = True
+            data._numFood += 1
+        if data._capsuleEaten != None:
+            data.capsules.insert( capsuleIndex, data._capsuleEaten )
+        for index, configuration, scaredTimer in prevAgents:
+            data.agentStates[index].configuration = configuration
+            data.agentStates[index].scaredTimer = scaredTimer
+        data._eaten = eaten
+        data.score = score
+        data.scoreChange = scoreChange
+        data._win = win
+        data._lose = lose
+        data._foodEaten = foodEaten
+        data._capsuleEaten = capsuleEaten
+        data._agentMoved = agentMoved
+        data._zobrist = prevHash
+
     def getLegalPacmanActions( self ):
         return self.getLegalActions( 0 )
 
@@ -174,7 +261,9 @@ class GameState:
         return self.data.capsules
 
     def getNumFood( self ):
-        return self.data.food.count()
+        if self.data._numFood == None:
+            self.data._numFood = self.data.food.count()
+        return self.data._numFood
 
     def getFood(self):
         """
@@ -361,11 +450,12 @@ class PacmanRules:
         # Eat food
         if state.data.food[x][y]:
             state.data.scoreChange += 10
-            state.data.food = state.data.food.copy()
+            numFood = state.getNumFood() - 1 # counted before the dot goes
+            if not state.data._foodOwned:
+                state.data.food = state.data.food.copy()
             state.data.food[x][y] = False
+            state.data._numFood = numFood
             state.data._foodEaten = position
-            # TODO: cache numFood?
-            numFood = state.getNumFood()
             if numFood == 0 and not state.data._lose:
                 state.data.scoreChange += 500
                 state.data._win = True
@@ -414,7 +504,9 @@ class GhostRules:
     def decrementTimer( ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint( ghostState.configuration.pos )
+            # A new configuration, the old one is shared with the predecessor state
+            configuration = ghostState.configuration
+            ghostState.configuration = Configuration( nearestPoint( configuration.pos ), configuration.direction )
         ghostState.scaredTimer = max( 0, timer - 1 )
     decrementTimer = staticmethod( decrementTimer )
 
@@ -439,6 +531,7 @@ class GhostRules:
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
             # Added for first-person
+            state.data._eaten = state.data._eaten[:] # shared with the predecessor state
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -0,0 +1,49 @@
+# timedGames.py
+# -------------
+# Plays timed games and checks that Pacman keeps to the time it is given.
+
+"""
+Plays games with the timing rules on, as pacman.py -c does, and checks
+that Pacman keeps to its time: no move took longer than the budget the
+game gave it (see Game.getMoveTimeLimit) by more than TOLERANCE seconds,
+and the game never warned it, timed it out or found it out of total time.
+Takes the options of pacman.py.  For example:
+
+> python timedGames.py -p AlphaBetaAgent -a iterative=1,ordering=1,ttSize=100000 -q --timeout 30
+
+Move budgets are only checked for agents that record them in moveTimes,
+as AlphaBetaAgent does with iterative=1.  The exit status is 1 if a check
+failed.
+"""
+
+import sys
+import pacman
+
+# Seconds a move may go over its budget: the first iteration of a search
+# always finishes, and the search cannot look at the clock in between
+TOLERANCE = 0.05
+
+def checkGames(games, agent):
+    "Returns a list of messages, one per way Pacman did not keep to its time"
+    failures = []
+    for (number, game) in enumerate(games):
+        if game.totalAgentTimeWarnings[0]:
+            failures.append('game %d: Pacman was warned %d time(s) for slow moves' % (
+                number + 1, game.totalAgentTimeWarnings[0]))
+        if game.agentTimeout:
+            failures.append('game %d: an agent timed out or ran out of time after %.2fs' % (
+                number + 1, game.totalAgentTimes[0]))
+    for (move, (budget, seconds)) in enumerate(getattr(agent, 'moveTimes', [])):
+        if seconds > budget + TOLERANCE:
+            failures.append('move %d took %.3fs of a %.3fs budget' % (move + 1, seconds, budget))
+    return failures
+
+if __name__ == '__main__':
+    args = pacman.readCommand(sys.argv[1:])
+    args['catchExceptions'] = True
+    games = pacman.runGames(**args)
+    failures = checkGames(games, args['pacman'])
+    for failure in failures:
+        print 'FAILURE ' + failure
+    print '%d failure(s) in %d game(s)' % (len(failures), len(games))
+    sys.exit(failures and 1 or 0)
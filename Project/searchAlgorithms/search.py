@@ -17,7 +17,12 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import hashlib
+import heapq
+import time
 import util
+from array import array
+from collections import deque
 
 class SearchProblem:
     """
@@ -72,7 +77,321 @@ def tinyMazeSearch(problem):
     w = Directions.WEST
     return  [s, s, w, s, w, w, s, w]
 
-def depthFirstSearch(problem):
+class SearchStatistics:
+    """
+    Counters the search functions in this file update while they run, read
+    by searchBenchmark.py.  Searches never reset them, because a heuristic
+    may start a search of its own; whoever measures a search calls reset()
+    before it.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.maxFringe = 0 # largest number of entries the fringe held at once
+        self.suboptimalityBound = None # set by anytime searches: cost / optimal cost is at most this
+        self.collisionProbability = None # set by searches with a FingerprintSet closed set
+        self.maxHeapEntries = 0 # set by smaStarSearch: most entries its two heaps held at once
+
+    def noteFringe(self, size):
+        if size > self.maxFringe:
+            self.maxFringe = size
+
+    def noteHeapEntries(self, size):
+        if size > self.maxHeapEntries:
+            self.maxHeapEntries = size
+
+statistics = SearchStatistics()
+
+def fringeEntries(fringe):
+    """
+    Returns something whose len() is the size of fringe: the list backing a
+    util.Stack, util.Queue or util.PriorityQueue, or an IntegerPriorityQueue
+    itself.
+    """
+    if isinstance(fringe, IntegerPriorityQueue):
+        return fringe
+    if hasattr(fringe, 'heap'):
+        return fringe.heap
+    return fringe.list
+
+class IntegerPriorityQueue:
+    """
+    A replacement for util.PriorityQueue that is faster while priorities are
+    non-negative whole numbers, as they are for the unit step costs and
+    integer heuristics of the Pacman search problems.  Items come out in
+    exactly the same order: lowest priority first, first in first out among
+    equal priorities.
+
+    It starts as a bucket queue, one first in first out bucket per priority
+    below BUCKET_LIMIT, so push and pop take O(1) amortized time.  A larger
+    priority turns it into a radix heap, which keeps O(1) pushes and
+    O(log C) amortized pops as long as no priority below the last one popped
+    is pushed.  A priority that is not a non-negative whole number, or
+    breaks that rule, turns it into a binary heap like util.PriorityQueue.
+    Priorities are only ever compared, so floats with whole values (path
+    costs kept as floats) count as whole numbers.
+    """
+    BUCKET_LIMIT = 4096 # buckets kept before switching to a radix heap
+    RADIX_BITS = 64     # priorities a radix heap holds are below 2 ** RADIX_BITS
+
+    def __init__(self):
+        self.mode = 'bucket'
+        self.count = 0    # entries ever pushed, the tie breaker
+        self.size = 0     # entries in the queue
+        self.buckets = [] # bucket mode: a deque of (priority, count, item) per priority
+        self.cursor = 0   # bucket mode: no bucket below this one holds an entry
+        self.last = 0     # radix mode: the priority popped last
+        self.heap = None  # heap mode: entries ordered like util.PriorityQueue's
+
+    def push(self, item, priority):
+        try:
+            key = int(priority)
+        except (OverflowError, ValueError): # infinite or not a number
+            key = -1
+        if key != priority or key < 0:
+            self._toHeap()
+        entry = (priority, self.count, item)
+        self.count += 1
+        self.size += 1
+        if self.mode == 'bucket':
+            if key >= IntegerPriorityQueue.BUCKET_LIMIT:
+                self._toRadix()
+            else:
+                buckets = self.buckets
+                while len(buckets) <= key:
+                    buckets.append(deque())
+                buckets[key].append(entry)
+                if key < self.cursor:
+                    self.cursor = key
+                return
+        if self.mode == 'radix':
+            if key < self.last or key >> IntegerPriorityQueue.RADIX_BITS:
+                self._toHeap()
+            else:
+                self.buckets[(key ^ self.last).bit_length()].append(entry)
+                return
+        heapq.heappush(self.heap, entry)
+
+    def pop(self):
+        self.size -= 1
+        if self.mode == 'bucket':
+            buckets = self.buckets
+            while not buckets[self.cursor]:
+                self.cursor += 1
+            return buckets[self.cursor].popleft()[2]
+        if self.mode == 'radix':
+            buckets = self.buckets
+            if not buckets[0]:
+                # the lowest non-empty bucket holds the lowest priorities; spread it over the buckets below
+                i = 1
+                while not buckets[i]:
+                    i += 1
+                entries = buckets[i]
+                buckets[i] = []
+                self.last = int(min([entry[0] for entry in entries]))
+                lowest = []
+                for entry in entries:
+                    if entry[0] == self.last:
+                        lowest.append(entry)
+                    else:
+                        buckets[(int(entry[0]) ^ self.last).bit_length()].append(entry)
+                lowest.sort(key=lambda entry: entry[1]) # first in first out among equal priorities
+                buckets[0] = deque(lowest)
+            return buckets[0].popleft()[2]
+        return heapq.heappop(self.heap)[2]
+
+    def isEmpty(self):
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
+    def _entries(self):
+        if self.mode == 'heap':
+            return self.heap
+        return [entry for bucket in self.buckets for entry in bucket]
+
+    def _toRadix(self):
+        entries = self._entries()
+        self.last = self.cursor # every priority in the queue is at least this
+        self.buckets = [deque()] + [[] for i in range(IntegerPriorityQueue.RADIX_BITS)]
+        for entry in entries: # still in priority order, so bucket 0 stays first in first out
+            self.buckets[(int(entry[0]) ^ self.last).bit_length()].append(entry)
+        self.mode = 'radix'
+
+    def _toHeap(self):
+        if self.mode == 'heap':
+            return
+        self.heap = self._entries()
+        heapq.heapify(self.heap)
+        self.buckets = []
+        self.mode = 'heap'
+
+class SearchNodeArena:
+    """
+    Stores the search tree built by the graph search functions below.
+
+    Every node is an index into parallel arrays holding its parent's index,
+    the action that reached it and its path cost, so adding a node is O(1)
+    instead of copying the whole path to it.  The list of actions is rebuilt
+    by getPath only once, when a goal node is found.
+    """
+    ROOT = -1 # parent index of the start node
+
+    def __init__(self):
+        self.parents = array('l')
+        self.actions = []
+        self.costs = array('d')
+
+    def addNode(self, parent, action, cost):
+        "Adds a node below parent and returns its index"
+        self.parents.append(parent)
+        self.actions.append(action)
+        self.costs.append(cost)
+        return len(self.actions) - 1
+
+    def getCost(self, node):
+        return self.costs[node]
+
+    def getPath(self, node):
+        "Returns the list of actions from the start node to node"
+        path = []
+        parents, actions = self.parents, self.actions
+        while parents[node] != SearchNodeArena.ROOT:
+            path.append(actions[node])
+            node = parents[node]
+        path.reverse()
+        return path
+
+    def __len__(self):
+        return len(self.actions)
+
+class FingerprintSet:
+    """
+    A set that stores a fingerprint of each state instead of the state:
+    hash(state) cut to FINGERPRINT_BITS bits (64 on 64 bit builds), kept in
+    an open addressing table backed by one unsigned array, so a member costs
+    8 bytes of a slot (16 at the lowest load) however big the state is.
+
+    Two states with the same fingerprint are taken to be the same state, so
+    a search using this as its closed set may wrongly skip a state.
+    collisionProbability estimates the chance that any two members collided.
+    Slots holding 0 are empty, so a fingerprint of 0 is stored as 1.
+    Probing perturbs the slot with the high bits of the fingerprint, the way
+    Python's dicts do, so weak low bits in a hash do not pile members up.
+    """
+    FINGERPRINT_BITS = 8 * array('L').itemsize
+    FINGERPRINT_MASK = (1 << FINGERPRINT_BITS) - 1
+
+    def __init__(self, capacity=1024):
+        size = 8
+        while size < 2 * capacity:
+            size *= 2
+        self.slots = array('L', [0]) * size
+        self.count = 0
+
+    def fingerprint(self, state):
+        return (hash(state) & FingerprintSet.FINGERPRINT_MASK) or 1
+
+    def _find(self, slots, fingerprint):
+        "Returns the slot holding fingerprint, or the empty slot where it belongs"
+        mask = len(slots) - 1
+        i = fingerprint & mask
+        perturb = fingerprint
+        while slots[i] != 0 and slots[i] != fingerprint:
+            perturb >>= 5
+            i = (5 * i + 1 + perturb) & mask
+        return i
+
+    def __contains__(self, state):
+        return self.slots[self._find(self.slots, self.fingerprint(state))] != 0
+
+    def add(self, state):
+        fingerprint = self.fingerprint(state)
+        i = self._find(self.slots, fingerprint)
+        if self.slots[i] != 0:
+            return
+        self.slots[i] = fingerprint
+        self.count += 1
+        if 2 * self.count > len(self.slots): # keep the table at most half full
+            self._grow()
+
+    def _grow(self):
+        slots = array('L', [0]) * (2 * len(self.slots))
+        for fingerprint in self.slots:
+            if fingerprint != 0:
+                slots[self._find(slots, fingerprint)] = fingerprint
+        self.slots = slots
+
+    def __len__(self):
+        return self.count
+
+    def collisionProbability(self):
+        "The birthday bound on the chance that two of the members share a fingerprint"
+        pairs = self.count * (self.count - 1) / 2.0
+        return min(1.0, pairs / 2.0 ** FingerprintSet.FINGERPRINT_BITS)
+
+def graphSearch(problem, fringe, priorityFunction=None, compactClosed=False):
+    """
+    The graph search shared by depthFirstSearch, breadthFirstSearch,
+    uniformCostSearch and aStarSearch; the fringe decides the order.
+
+    The fringe holds (state, node) pairs where node indexes a
+    SearchNodeArena.  If priorityFunction is given the fringe is a priority
+    queue and each pair is pushed with priorityFunction(state, pathCost).
+    Returns the list of actions to the first goal popped, or [] if the
+    fringe runs out.
+
+    With compactClosed the closed set is a FingerprintSet, which keeps 8
+    bytes per state instead of the states themselves; the chance that a
+    fingerprint collision made the search skip a state is then left in
+    statistics.collisionProbability.
+    """
+    arena = SearchNodeArena()
+    root_state = problem.getStartState() #get the intial state
+    root_node = arena.addNode(SearchNodeArena.ROOT, None, 0)
+    if priorityFunction is None:
+        fringe.push((root_state, root_node))
+    else:
+        fringe.push((root_state, root_node), priorityFunction(root_state, 0))
+    if compactClosed:
+        closed_set = FingerprintSet()
+    else:
+        closed_set = set()  #close_set consists of already explored nodes
+    entries = fringeEntries(fringe)
+
+    while not fringe.isEmpty(): #Iterate until you find the goal node
+        statistics.noteFringe(len(entries))
+        (check_state, check_node) = fringe.pop()
+        if problem.isGoalState(check_state): #If the goal node is found, rebuild its path once
+            if compactClosed:
+                statistics.collisionProbability = closed_set.collisionProbability()
+            return arena.getPath(check_node)
+        elif check_state not in closed_set:   # if the state is not already visited, explore and add it to the visited states
+            closed_set.add(check_state)
+            node_cost = arena.costs[check_node]
+            for (state, action, cost) in problem.getSuccessors(check_state):
+                # the successor only records its parent and action, the path is not copied
+                node = arena.addNode(check_node, action, node_cost + cost)
+                if priorityFunction is None:
+                    fringe.push((state, node))
+                else:
+                    fringe.push((state, node), priorityFunction(state, node_cost + cost))
+    if compactClosed:
+        statistics.collisionProbability = closed_set.collisionProbability()
+    return []
+
+CLOSED_SET_MODES = ['exact', 'fingerprint', 'frontier'] # values of the closed argument below
+
+def _compactClosed(closed):
+    if closed not in CLOSED_SET_MODES:
+        raise Exception, 'closed must be one of %s, not %s' % (', '.join(CLOSED_SET_MODES), closed)
+    if closed == 'frontier':
+        raise Exception, "closed='frontier' only works with breadthFirstSearch and aStarSearch"
+    return closed == 'fingerprint'
+
+def depthFirstSearch(problem, closed='exact'):
     """
     Search the deepest nodes in the search tree first.
 
@@ -87,115 +406,1028 @@ def depthFirstSearch(problem):
     print "Start's successors:", problem.getSuccessors(problem.getStartState())
     """
     "*** YOUR CODE HERE ***"
-    
-    root_node = problem.getStartState() #get the intial state
-    fringe_nodes = util.Stack()  #fringe nodes is an openset follows LIFO structure, which has nodes to be explored 
-    node_path  = [] 
-    fringe_nodes.push((root_node,node_path))
-    closed_set = set()  #close_set consists of already explored nodes
-  
-    while True: #Iterate until you find the goal node
-        (check_node,node_path) = fringe_nodes.pop()
-        if problem.isGoalState(check_node): #If the goal node is found,  search is successful, hence break.
-            break
-        elif check_node not in closed_set:   # if the state is not already visited, explore and add it to the visited states
-            closed_set.add(check_node) 
-            successor_nodes = problem.getSuccessors(check_node)  #retrieve the  successor states
-            for (node,next_path,_) in successor_nodes:
+    #fringe nodes is an openset follows LIFO structure, which has nodes to be explored
+    return graphSearch(problem, util.Stack(), compactClosed=_compactClosed(closed))
 
-                fringe_nodes.push((node,node_path+[next_path])) # add  the  successor states to explore further
+def breadthFirstSearch(problem, closed='exact'):
+    """
+    Search the shallowest nodes in the search tree first.  closed='fingerprint'
+    keeps a FingerprintSet of 64 bit fingerprints as the closed set (here and
+    in the other graph searches); closed='frontier' keeps no closed set at
+    all, see frontierSearch.
+    """
+    "*** YOUR CODE HERE ***"
+    if closed == 'frontier':
+        return frontierSearch(problem)
+    #fringe nodes is an openset follows FIFO structure, which has nodes to be explored
+    return graphSearch(problem, util.Queue(), compactClosed=_compactClosed(closed))
 
-    #print("res",node_path)
-    return node_path
+def uniformCostSearch(problem, closed='exact'):
+    """Search the node of least total cost first."""
+    "*** YOUR CODE HERE ***"
+    #fringe nodes are stored in the priority queue  with respect to the cost, lowest lost has highest priority
+    return graphSearch(problem, IntegerPriorityQueue(), lambda state, cost: cost,
+                       compactClosed=_compactClosed(closed))
 
-    #util.raiseNotDefined()
+def nullHeuristic(state, problem=None):
+    """
+    A heuristic function estimates the cost from the current state to the nearest
+    goal in the provided SearchProblem.  This heuristic is trivial.
+    """
+    return 0
 
-def breadthFirstSearch(problem):
-    """Search the shallowest nodes in the search tree first."""
+def aStarSearch(problem, heuristic=nullHeuristic, closed='exact'):
+    """Search the node that has the lowest combined cost and heuristic first."""
     "*** YOUR CODE HERE ***"
-    root_node = problem.getStartState() #get the intial state
-    fringe_nodes = util.Queue()  #fringe nodes is an openset follows FIFO structure, which has nodes to be explored 
-    node_path  = [] 
-    fringe_nodes.push((root_node,node_path))
-    closed_set = set()  #close_set consists of already explored nodes
-  
-    while True: #Iterate until you find the goal node
-        (check_node,node_path) = fringe_nodes.pop()
-        if problem.isGoalState(check_node): #If the goal node is found,  search is successful, hence break.
-            break
-        elif check_node not in closed_set:   # if the state is not already visited, explore and add it to the visited states
-            closed_set.add(check_node) 
-            successor_nodes = problem.getSuccessors(check_node)  #retrieve the  successor states
-            for (node,next_path,_) in successor_nodes:
+    if closed == 'frontier':
+        return frontierSearch(problem, heuristic)
+    #fringe nodes are stored in the priority queue  with respect to the node_cost+ heuristic_cost, lowest lost has highest priority
+    return graphSearch(problem, IntegerPriorityQueue(),
+                       lambda state, cost: cost + heuristic(state, problem),
+                       compactClosed=_compactClosed(closed))
 
-                fringe_nodes.push((node,node_path+[next_path])) # add  the  successor states to explore further
+def greedySearch(problem, heuristic=nullHeuristic):
+    """
+    Search the node with the lowest heuristic first, ignoring the cost so
+    far.  Fast when the heuristic points the right way, but the path found
+    need not be optimal.
+    """
+    #fringe nodes are stored in the priority queue with respect to the heuristic_cost only
+    return graphSearch(problem, IntegerPriorityQueue(), lambda state, cost: heuristic(state, problem))
 
-    #print("res",node_path)
-    return node_path
 
-    util.raiseNotDefined()
+def aStarBestGSearch(problem, heuristic=nullHeuristic):
+    """
+    A* that keeps the cheapest known path cost (best g) of every state.
 
-def uniformCostSearch(problem):
-    """Search the node of least total cost first."""
-    "*** YOUR CODE HERE ***"
-    root_node = problem.getStartState() #get the intial state
-    fringe_nodes = util.PriorityQueue() #fringe nodes are stored in the priority queue  with respect to the cost, lowest lost has highest priority
-    node_path  = [] 
-    node_cost = 0
-    fringe_nodes.push((root_node,node_path,node_cost),node_cost)
-    closed_set = set()  #close_set consists of already explored nodes
-  
-    while True: #Iterate until you find the goal node
-        (check_node,node_path,node_cost) = fringe_nodes.pop()
-        if problem.isGoalState(check_node): #If the goal node is found,  search is successful, hence break.
+    A successor is pushed only when it improves on its state's best g, so
+    dominated copies never reach the fringe.  When a cheaper path is found
+    for a state that is already queued, the old entry is left in place and
+    skipped when it is popped (lazy decrease-key).  A state that was already
+    expanded is reopened the same way, which keeps the result optimal for
+    admissible heuristics that are not consistent.
+    """
+    arena = SearchNodeArena()
+    fringe = util.PriorityQueue()
+    root_state = problem.getStartState()
+    best_g = {root_state: 0} # cheapest path cost found so far for each state
+    heu_costs = {}           # heuristic values, so reopened states are not re-estimated
+
+    def estimate(state):
+        if state not in heu_costs:
+            heu_costs[state] = heuristic(state, problem)
+        return heu_costs[state]
+
+    fringe.push((root_state, arena.addNode(SearchNodeArena.ROOT, None, 0)), estimate(root_state))
+    while not fringe.isEmpty():
+        statistics.noteFringe(len(fringe.heap))
+        (check_state, check_node) = fringe.pop()
+        node_cost = arena.costs[check_node]
+        if node_cost > best_g[check_state]: # stale entry, a cheaper copy was pushed after it
+            continue
+        if problem.isGoalState(check_state):
+            return arena.getPath(check_node)
+        for (state, action, cost) in problem.getSuccessors(check_state):
+            next_cost = node_cost + cost
+            if state in best_g and best_g[state] <= next_cost: # dominated, don't push it
+                continue
+            best_g[state] = next_cost # new or cheaper path: (re)open the state
+            node = arena.addNode(check_node, action, next_cost)
+            fringe.push((state, node), next_cost + estimate(state))
+    return []
+
+
+def checkConsistency(problem, heuristic, limit=100000):
+    """
+    Checks heuristic for consistency on the states reachable from the start,
+    visiting at most limit states breadth first.
+
+    Returns a list of violations, each a tuple (state, successor, stepCost,
+    h(state), h(successor)) for an edge where h(state) > stepCost +
+    h(successor), or (state, None, 0, h(state), 0) for a goal state whose
+    heuristic value is not 0.  An empty list means no violation was found.
+    """
+    violations = []
+    start = problem.getStartState()
+    seen = set([start])
+    frontier = util.Queue()
+    frontier.push(start)
+    while not frontier.isEmpty() and len(seen) <= limit:
+        state = frontier.pop()
+        heu_cost = heuristic(state, problem)
+        if problem.isGoalState(state):
+            if heu_cost != 0:
+                violations.append((state, None, 0, heu_cost, 0))
+            continue
+        for (next_state, _, cost) in problem.getSuccessors(state):
+            next_heu_cost = heuristic(next_state, problem)
+            if heu_cost > cost + next_heu_cost:
+                violations.append((state, next_state, cost, heu_cost, next_heu_cost))
+            if next_state not in seen:
+                seen.add(next_state)
+                frontier.push(next_state)
+    return violations
+
+
+def jumpPointSearch(problem):
+    """
+    Jump point search for a PositionSearchProblem with unit step costs.
+
+    Works directly on problem.walls: from every expanded cell it scans in
+    straight lines and only stops at the goal or at "jump points", cells
+    where a wall makes a turn necessary, so the many symmetric shortest
+    paths of an open room are never expanded one cell at a time.
+    Horizontal scans stop at a cell with a forced neighbor above or below
+    it; vertical scans stop at a cell from which a horizontal scan finds a
+    jump point.  Jump points are searched with A* and the Manhattan
+    distance, and the straight segments between them are unrolled into the
+    usual list of actions.
+    """
+    from game import Directions
+    walls, goal = problem.walls, problem.goal
+    width, height = walls.width, walls.height
+    vectors = {Directions.NORTH: (0, 1), Directions.SOUTH: (0, -1),
+               Directions.EAST: (1, 0), Directions.WEST: (-1, 0)}
+    directions = {}
+    for direction, vector in vectors.items():
+        directions[vector] = direction
+
+    def isOpen(x, y):
+        return 0 <= x < width and 0 <= y < height and not walls[x][y]
+
+    def jumpHorizontal(x, y, dx):
+        "Scans from (x, y) along dx and returns the first jump point, or None at a wall"
+        while True:
+            x += dx
+            if not isOpen(x, y): return None
+            if (x, y) == goal: return (x, y)
+            # a cell above or below that the previous cell could not step into is forced
+            if (isOpen(x, y + 1) and not isOpen(x - dx, y + 1)) or \
+               (isOpen(x, y - 1) and not isOpen(x - dx, y - 1)):
+                return (x, y)
+
+    def jumpVertical(x, y, dy):
+        "Scans from (x, y) along dy, stopping where a horizontal scan would find a jump point"
+        while True:
+            y += dy
+            if not isOpen(x, y): return None
+            if (x, y) == goal: return (x, y)
+            if jumpHorizontal(x, y, 1) != None or jumpHorizontal(x, y, -1) != None:
+                return (x, y)
+
+    def prunedVectors(cell, arrival):
+        "The directions worth scanning from a jump point reached along arrival"
+        x, y = cell
+        if arrival == None: # the start cell scans everywhere
+            return vectors.values()
+        dx, dy = arrival
+        if dx == 0: # vertical arrivals keep going and scan both ways horizontally
+            return [(0, dy), (1, 0), (-1, 0)]
+        forced = [(dx, 0)]
+        for ny in (1, -1):
+            if isOpen(x, y + ny) and not isOpen(x - dx, y + ny):
+                forced.append((0, ny))
+        return forced
+
+    root = problem.getStartState()
+    fringe = util.PriorityQueue()
+    best_g = {root: 0}
+    parents = {root: None} # jump point -> the jump point it was reached from
+    fringe.push((root, None, 0), util.manhattanDistance(root, goal))
+    closed_set = set()
+    while not fringe.isEmpty():
+        statistics.noteFringe(len(fringe.heap))
+        (cell, arrival, node_cost) = fringe.pop()
+        if cell in closed_set or node_cost > best_g[cell]:
+            continue
+        if problem.isGoalState(cell):
+            # unroll the straight segments between consecutive jump points
+            path = []
+            while parents[cell] != None:
+                previous = parents[cell]
+                dx, dy = cell[0] - previous[0], cell[1] - previous[1]
+                length = abs(dx) + abs(dy)
+                path.extend([directions[(dx / length, dy / length)]] * length)
+                cell = previous
+            path.reverse()
+            return path
+        closed_set.add(cell)
+        problem._expanded += 1 # keep the statistics and display of PositionSearchProblem working
+        if getattr(problem, 'visualize', False): problem._visitedlist.append(cell)
+        for (dx, dy) in prunedVectors(cell, arrival):
+            if dx == 0:
+                jump_point = jumpVertical(cell[0], cell[1], dy)
+            else:
+                jump_point = jumpHorizontal(cell[0], cell[1], dx)
+            if jump_point == None or jump_point in closed_set:
+                continue
+            next_cost = node_cost + util.manhattanDistance(cell, jump_point)
+            if jump_point in best_g and best_g[jump_point] <= next_cost:
+                continue
+            best_g[jump_point] = next_cost
+            parents[jump_point] = cell
+            fringe.push((jump_point, (dx, dy), next_cost), next_cost + util.manhattanDistance(jump_point, goal))
+    return []
+
+
+class ReversedSearchProblem:
+    """
+    Presents a problem with a single goal (problem.goal) and a
+    getReverseSuccessors method as the problem of walking from that goal
+    back to the start.  Other attributes are read from the wrapped problem,
+    so goal-directed heuristics such as manhattanHeuristic estimate the
+    distance back to the start when given this view.
+    """
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def getStartState(self):
+        return self.problem.goal
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        return self.problem.getReverseSuccessors(state)
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+def _checkBidirectional(problem):
+    if 'goal' not in dir(problem) or 'getReverseSuccessors' not in dir(problem):
+        raise Exception, 'bidirectional search needs a problem with a single goal and getReverseSuccessors'
+
+def _joinPaths(meet, forward_parents, backward_parents):
+    """
+    Returns the actions from the start to meet (following forward_parents,
+    state -> (previous state, action)) and on to the goal (following
+    backward_parents, state -> (next state, action)).
+    """
+    path = []
+    state = meet
+    while forward_parents[state] != None:
+        (state, action) = forward_parents[state]
+        path.append(action)
+    path.reverse()
+    state = meet
+    while backward_parents[state] != None:
+        (state, action) = backward_parents[state]
+        path.append(action)
+    return path
+
+def bidirectionalSearch(problem):
+    """
+    Breadth first search from the start and from problem.goal at once,
+    always growing the side with the smaller frontier by one full layer.
+    The searches meet after about 2*b^(d/2) expansions instead of b^d, and
+    checking every meeting found in the layer that first meets keeps the
+    path as short as breadth first search's.
+    """
+    _checkBidirectional(problem)
+    start, goal = problem.getStartState(), problem.goal
+    if problem.isGoalState(start):
+        return []
+    forward_parents, backward_parents = {start: None}, {goal: None}
+    forward_depths, backward_depths = {start: 0}, {goal: 0}
+    forward_frontier, backward_frontier = [start], [goal]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            (frontier, parents, depths, other_depths) = (forward_frontier, forward_parents, forward_depths, backward_depths)
+            expand = problem.getSuccessors
+        else:
+            (frontier, parents, depths, other_depths) = (backward_frontier, backward_parents, backward_depths, forward_depths)
+            expand = problem.getReverseSuccessors
+        statistics.noteFringe(len(forward_frontier) + len(backward_frontier))
+        next_frontier = []
+        meet, meet_length = None, None
+        for state in frontier:
+            for (next_state, action, _) in expand(state):
+                if next_state in depths:
+                    continue
+                parents[next_state] = (state, action) # backward, action leads from next_state to state
+                depths[next_state] = depths[state] + 1
+                next_frontier.append(next_state)
+                if next_state in other_depths:
+                    length = depths[next_state] + other_depths[next_state]
+                    if meet == None or length < meet_length:
+                        meet, meet_length = next_state, length
+        if expand == problem.getSuccessors:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+        if meet != None:
+            problem.isGoalState(goal) # lets the display draw the expanded cells
+            return _joinPaths(meet, forward_parents, backward_parents)
+    return []
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    A* from the start towards problem.goal and from the goal back towards
+    the start, expanding whichever side has the lower f value on top.
+
+    The backward search evaluates heuristic on a ReversedSearchProblem, so
+    a goal-directed heuristic estimates the distance back to the start.
+    Every time the two searches touch, the joined path cost becomes a
+    candidate; the search stops once the best candidate is no larger than
+    the larger of the two smallest f values, which is optimal for consistent
+    heuristics.
+    """
+    _checkBidirectional(problem)
+    start, goal = problem.getStartState(), problem.goal
+    if problem.isGoalState(start):
+        return []
+    reversed_problem = ReversedSearchProblem(problem)
+    sides = [] # (fringe, g values, parents, expand, heuristic problem) for forward and backward
+    for (root, expand, heu_problem) in [(start, problem.getSuccessors, problem),
+                                        (goal, problem.getReverseSuccessors, reversed_problem)]:
+        fringe = []
+        heapq.heappush(fringe, (heuristic(root, heu_problem), 0, root, 0))
+        sides.append((fringe, {root: 0}, {root: None}, expand, heu_problem))
+    counter = 1
+    best_cost, meet = float('inf'), None
+
+    while True:
+        for (fringe, g_values, _, _, _) in sides: # drop entries superseded by cheaper paths
+            while fringe and fringe[0][3] > g_values[fringe[0][2]]:
+                heapq.heappop(fringe)
+        if not sides[0][0] or not sides[1][0]:
+            break
+        if best_cost <= max(sides[0][0][0][0], sides[1][0][0][0]):
             break
-        elif check_node not in closed_set:   # if the state is not already visited, explore and add it to the visited states
-            closed_set.add(check_node) 
-            successor_nodes = problem.getSuccessors(check_node)  #retrieve the  successor states
-            for (node,next_path,cost) in successor_nodes:
+        statistics.noteFringe(len(sides[0][0]) + len(sides[1][0]))
+        side = int(sides[1][0][0][0] < sides[0][0][0][0])
+        (fringe, g_values, parents, expand, heu_problem) = sides[side]
+        other_g_values = sides[1 - side][1]
+        state = heapq.heappop(fringe)[2]
+        for (next_state, action, cost) in expand(state):
+            next_cost = g_values[state] + cost
+            if next_state in g_values and g_values[next_state] <= next_cost:
+                continue
+            g_values[next_state] = next_cost
+            parents[next_state] = (state, action)
+            heapq.heappush(fringe, (next_cost + heuristic(next_state, heu_problem), counter, next_state, next_cost))
+            counter += 1
+            if next_state in other_g_values and next_cost + other_g_values[next_state] < best_cost:
+                best_cost, meet = next_cost + other_g_values[next_state], next_state
 
-                fringe_nodes.push((node,node_path+[next_path],node_cost+cost),node_cost+cost) # add  the  successor states to explore further
+    if meet == None:
+        return []
+    problem.isGoalState(goal) # lets the display draw the expanded cells
+    return _joinPaths(meet, sides[0][2], sides[1][2])
 
-    #print("res",node_path)
-    return node_path
-    util.raiseNotDefined()
 
-def nullHeuristic(state, problem=None):
+class ClusterAbstraction:
     """
-    A heuristic function estimates the cost from the current state to the nearest
-    goal in the provided SearchProblem.  This heuristic is trivial.
+    The abstract graph hierarchicalSearch plans on, for one walls Grid.
+
+    The grid is cut into square clusters of clusterSize cells.  Along each
+    border between two clusters, every run of cells open on both sides is
+    an entrance: runs shorter than 6 cells cross in their middle, longer
+    ones at both ends.  The cells on either side of a crossing are the
+    nodes of the graph, joined by the one step across the border and, in
+    each cluster, by the shortest paths between nodes of the same cluster,
+    found by breadth first search inside the cluster.  Every edge keeps its
+    actions, so an abstract path is refined by concatenating them.
     """
-    return 0
+    SHORT_ENTRANCE = 6 # entrances at least this long get two crossings
 
-def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
-    "*** YOUR CODE HERE ***"
-    root_node = problem.getStartState() #get the intial state
-    fringe_nodes = util.PriorityQueue() #fringe nodes are stored in the priority queue  with respect to the node_cost+ heuristic_cost, lowest lost has highest priority
-    node_path  = [] 
-    node_cost = 0
-    heu_cost = heuristic(root_node,problem)
-    fringe_nodes.push((root_node,node_path,node_cost),node_cost+heu_cost)
-    closed_set = set()  #close_set consists of already explored nodes
-  
-    while True: #Iterate until you find the goal node
-        (check_node,node_path,node_cost) = fringe_nodes.pop()
-        if problem.isGoalState(check_node): #If the goal node is found,  search is successful, hence break.
+    def __init__(self, walls, clusterSize):
+        from game import Directions
+        self.walls = walls
+        self.clusterSize = clusterSize
+        self.edges = {}         # node -> list of (node, cost, actions)
+        self.clusterNodes = {}  # cluster -> nodes inside it
+        width, height = walls.width, walls.height
+        for x0 in range(clusterSize - 1, width - 1, clusterSize):
+            for y0 in range(0, height, clusterSize):
+                rows = range(y0, min(y0 + clusterSize, height))
+                for y in self._crossings([not walls[x0][y] and not walls[x0 + 1][y] for y in rows]):
+                    self._addCrossing((x0, rows[y]), (x0 + 1, rows[y]), Directions.EAST, Directions.WEST)
+        for y0 in range(clusterSize - 1, height - 1, clusterSize):
+            for x0 in range(0, width, clusterSize):
+                columns = range(x0, min(x0 + clusterSize, width))
+                for x in self._crossings([not walls[x][y0] and not walls[x][y0 + 1] for x in columns]):
+                    self._addCrossing((columns[x], y0), (columns[x], y0 + 1), Directions.NORTH, Directions.SOUTH)
+        for nodes in self.clusterNodes.values():
+            for node in nodes:
+                paths = self.clusterPaths(node, nodes)
+                for other in nodes:
+                    if other != node and other in paths:
+                        self.edges[node].append((other, len(paths[other]), paths[other]))
+
+    def _crossings(self, open_pairs):
+        "Returns the indices at which to cross a border, given which of its cell pairs are open"
+        crossings = []
+        i = 0
+        while i < len(open_pairs):
+            if not open_pairs[i]:
+                i += 1
+                continue
+            first = i
+            while i < len(open_pairs) and open_pairs[i]:
+                i += 1
+            last = i - 1
+            if last - first + 1 < ClusterAbstraction.SHORT_ENTRANCE:
+                crossings.append((first + last) / 2)
+            else:
+                crossings.extend([first, last])
+        return crossings
+
+    def _addCrossing(self, cell1, cell2, forward, backward):
+        for cell in (cell1, cell2):
+            if cell not in self.edges:
+                self.edges[cell] = []
+                self.clusterNodes.setdefault(self.clusterOf(cell), []).append(cell)
+        self.edges[cell1].append((cell2, 1, [forward]))
+        self.edges[cell2].append((cell1, 1, [backward]))
+
+    def clusterOf(self, cell):
+        return (cell[0] / self.clusterSize, cell[1] / self.clusterSize)
+
+    def clusterPaths(self, source, targets, problem=None):
+        """
+        Returns {target: actions} for the cells of targets that a breadth
+        first search from source reaches without leaving its cluster.  If
+        problem is given its expansion count is kept up to date.
+        """
+        from game import Directions
+        walls, size = self.walls, self.clusterSize
+        cx, cy = self.clusterOf(source)
+        left, bottom = cx * size, cy * size
+        right, top = min(left + size, walls.width), min(bottom + size, walls.height)
+        targets = set(targets)
+        parents = {source: None}
+        queue = [source]
+        head = 0
+        found = {}
+        while head < len(queue) and len(found) < len(targets):
+            cell = queue[head]
+            head += 1
+            if cell in targets:
+                found[cell] = True
+            if problem != None: problem._expanded += 1
+            x, y = cell
+            for direction, (nextx, nexty) in [(Directions.NORTH, (x, y + 1)), (Directions.SOUTH, (x, y - 1)),
+                                              (Directions.EAST, (x + 1, y)), (Directions.WEST, (x - 1, y))]:
+                if left <= nextx < right and bottom <= nexty < top and not walls[nextx][nexty] \
+                   and (nextx, nexty) not in parents:
+                    parents[(nextx, nexty)] = (cell, direction)
+                    queue.append((nextx, nexty))
+        paths = {}
+        for target in targets:
+            if target not in parents: continue
+            path = []
+            cell = target
+            while parents[cell] != None:
+                cell, direction = parents[cell]
+                path.append(direction)
+            path.reverse()
+            paths[target] = path
+        return paths
+
+def wallsKey(walls):
+    "Returns a hex digest that identifies a walls Grid by its contents"
+    cells = ''.join([wall and '1' or '0' for column in walls.data for wall in column])
+    return hashlib.sha1('%d,%d,%s' % (walls.width, walls.height, cells)).hexdigest()
+
+class WallsCache:
+    """
+    Keeps one object built from each distinct layout.  Grids with the same
+    walls share an entry; looking up a Grid object seen before skips hashing
+    its contents.  build(walls, key) makes the object for a new layout.
+    """
+    MAX_GRIDS = 64 # Grid objects remembered by identity; each game copies its walls
+
+    def __init__(self, build):
+        self.build = build
+        self.byKey = {}  # wallsKey -> object
+        self.byGrid = {} # id(walls) -> (walls, object)
+
+    def get(self, walls):
+        entry = self.byGrid.get(id(walls))
+        if entry != None and entry[0] is walls:
+            return entry[1]
+        key = wallsKey(walls)
+        if key not in self.byKey:
+            self.byKey[key] = self.build(walls, key)
+        if len(self.byGrid) >= WallsCache.MAX_GRIDS:
+            self.byGrid.clear()
+        self.byGrid[id(walls)] = (walls, self.byKey[key])
+        return self.byKey[key]
+
+_clusterAbstractions = WallsCache(lambda walls, key: {}) # layout -> {clusterSize: ClusterAbstraction}
+
+def getClusterAbstraction(walls, clusterSize):
+    "Returns the ClusterAbstraction of walls, built once per layout and cluster size"
+    abstractions = _clusterAbstractions.get(walls)
+    if clusterSize not in abstractions:
+        abstractions[clusterSize] = ClusterAbstraction(walls, clusterSize)
+    return abstractions[clusterSize]
+
+def hierarchicalSearch(problem, clusterSize=10):
+    """
+    Hierarchical path-finding A* (HPA*) for a PositionSearchProblem with
+    unit step costs.
+
+    Plans on the ClusterAbstraction of problem.walls, built once per
+    layout: the start and the goal are linked to the nodes of their own
+    clusters by breadth first searches inside those clusters, A* with the
+    Manhattan distance finds the shortest abstract path, and the actions
+    stored on its edges are joined into the answer.  A query expands
+    abstract nodes along the way instead of every cell, so its cost grows
+    with the path length rather than the maze size.  The path is the
+    shortest one through the chosen crossings, which is usually, but not
+    always, a shortest path.
+    """
+    from game import Directions
+    start, goal = problem.getStartState(), problem.goal
+    if problem.isGoalState(start):
+        return []
+    abstraction = getClusterAbstraction(problem.walls, clusterSize)
+    edges = abstraction.edges
+    start_nodes = abstraction.clusterNodes.get(abstraction.clusterOf(start), [])
+    goal_nodes = abstraction.clusterNodes.get(abstraction.clusterOf(goal), [])
+    # links for this query only: start to its cluster's nodes (and to the goal in the same cluster),
+    # and from the goal cluster's nodes to the goal
+    start_links = abstraction.clusterPaths(start, start_nodes + [goal], problem).items()
+    goal_links = {}
+    for (node, path) in abstraction.clusterPaths(goal, goal_nodes, problem).items():
+        goal_links[node] = [Directions.REVERSE[action] for action in reversed(path)]
+
+    def neighbors(node):
+        links = edges.get(node, [])
+        if node == start:
+            links = links + [(other, len(path), path) for (other, path) in start_links]
+        if node in goal_links:
+            links = links + [(goal, len(goal_links[node]), goal_links[node])]
+        return links
+
+    fringe = [(util.manhattanDistance(start, goal), 0, start, 0)]
+    best_g = {start: 0}
+    parents = {start: None} # node -> (previous node, actions from it)
+    closed_set = set()
+    counter = 1
+    while fringe:
+        statistics.noteFringe(len(fringe))
+        (_, _, node, node_cost) = heapq.heappop(fringe)
+        if node in closed_set or node_cost > best_g[node]:
+            continue
+        if node == goal:
+            problem.isGoalState(goal) # lets the display draw the expanded cells
+            path = []
+            while parents[node] != None:
+                node, actions = parents[node]
+                path.append(actions)
+            path.reverse()
+            return [action for actions in path for action in actions]
+        closed_set.add(node)
+        problem._expanded += 1
+        if getattr(problem, 'visualize', False): problem._visitedlist.append(node)
+        for (next_node, cost, actions) in neighbors(node):
+            next_cost = node_cost + cost
+            if next_node in best_g and best_g[next_node] <= next_cost:
+                continue
+            best_g[next_node] = next_cost
+            parents[next_node] = (node, actions)
+            heapq.heappush(fringe, (next_cost + util.manhattanDistance(next_node, goal), counter, next_node, next_cost))
+            counter += 1
+    return []
+
+class _RetargetedSearchProblem:
+    "Shows problem with another goal, so goal-directed heuristics aim there"
+    def __init__(self, problem, goal):
+        self.problem = problem
+        self.goal = goal
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+def _meetInTheMiddle(problem, start, goal, heuristic, bound, balanced=False):
+    """
+    Breadth first search from start and from goal at once, one layer at a
+    time on the side with the smaller layer (or, if balanced, the side that
+    is less deep, so the meeting state is in the middle), keeping only each
+    side's last two layers.  With reversible moves every neighbor of a layer lies in the
+    layer before it, the layer itself or the next one, so those are all
+    that is needed to not generate a state twice.  If heuristic is given,
+    states whose depth plus heuristic estimate (towards the far end)
+    exceeds bound are left out.
+
+    Returns (meet, start depth, goal depth) for the first state generated
+    by both sides, which lies on a shortest path if that path is no longer
+    than bound.  Otherwise returns (None, a larger bound that is still no
+    more than the shortest path length).
+    """
+    if start == goal:
+        return (start, 0, 0)
+    sides = [] # [previous layer, layer, depth, heuristic problem] from start and from goal
+    for (root, target) in [(start, goal), (goal, start)]:
+        sides.append([set(), [root], 0, _RetargetedSearchProblem(problem, target)])
+    layer_sets = [set([start]), set([goal])]
+    pruned = float('inf')
+    while sides[0][1] and sides[1][1]:
+        statistics.noteFringe(sum([len(side[0]) + len(side[1]) for side in sides]))
+        if balanced:
+            i = int(sides[1][2] < sides[0][2])
+        else:
+            i = int(len(sides[1][1]) < len(sides[0][1]))
+        (previous, layer, depth, heu_problem) = sides[i]
+        current = layer_sets[i]
+        next_layer, next_set = [], set()
+        for state in layer:
+            for (next_state, _, cost) in problem.getSuccessors(state):
+                if next_state in previous or next_state in current or next_state in next_set:
+                    continue
+                if heuristic != None:
+                    if cost != 1:
+                        raise Exception, 'frontier A* needs unit step costs'
+                    f = depth + 1 + heuristic(next_state, heu_problem)
+                    if f > bound:
+                        pruned = min(pruned, f)
+                        continue
+                next_set.add(next_state)
+                next_layer.append(next_state)
+        sides[i][0:3] = [current, next_layer, depth + 1]
+        layer_sets[i] = next_set
+        for state in next_layer:
+            if state in layer_sets[1 - i]:
+                if sides[0][2] + sides[1][2] > bound:
+                    # shortest within what the bound let in, but maybe only because it cut the
+                    # shortest path; that is at least min(this length, the smallest cut f) long
+                    return (None, min(pruned, sides[0][2] + sides[1][2]))
+                return (state, sides[0][2], sides[1][2])
+    return (None, pruned)
+
+def _stepBetween(problem, state, next_state):
+    for (successor, action, _) in problem.getSuccessors(state):
+        if successor == next_state:
+            return action
+    raise Exception, 'no move from %s to %s' % (str(state), str(next_state))
+
+def frontierSearch(problem, heuristic=None):
+    """
+    Shortest paths without a closed list, for problems whose moves can be
+    undone (they declare reversible = True, so the successors of a state
+    are also its predecessors) and that have a single goal, problem.goal.
+
+    The path is found by divide and conquer: a search from both ends that
+    keeps only its last two layers per side (_meetInTheMiddle) finds a
+    state halfway along a shortest path, and the two halves are solved the
+    same way, down to single moves.  Memory is proportional to the widest
+    layer instead of the explored area; the time is that of a few searches
+    per halving of the path, O(log(path length)) of them.
+
+    Without heuristic this is breadth first search (fewest actions).  With
+    it, it is breadth-first iterative-deepening A*: states whose depth plus
+    estimate exceed a bound are cut, starting at h(start) and raising the
+    bound to the smallest cut value until the ends meet; the halves then
+    reuse their known length as the bound.  That needs unit step costs and
+    an admissible, goal-directed heuristic.
+    """
+    if not getattr(problem, 'reversible', False) or 'goal' not in dir(problem):
+        raise Exception, 'frontier search needs a problem with reversible moves and a single goal'
+    start, goal = problem.getStartState(), problem.goal
+    if heuristic == None:
+        bound = float('inf')
+    else:
+        bound = heuristic(start, problem)
+    while True:
+        result = _meetInTheMiddle(problem, start, goal, heuristic, bound)
+        if result[0] != None:
+            break
+        if heuristic == None or result[1] == float('inf'):
+            return [] # the goal cannot be reached
+        bound = result[1]
+
+    path = []
+    segments = [(start, result[0], result[1]), (result[0], goal, result[2])] # (from, to, length) to solve, in order
+    segments.reverse()
+    while segments:
+        (first, last, length) = segments.pop()
+        if length == 0:
+            continue
+        if length == 1:
+            path.append(_stepBetween(problem, first, last))
+            continue
+        (middle, first_length, last_length) = _meetInTheMiddle(problem, first, last, heuristic, length, True)
+        segments.append((middle, last, last_length))
+        segments.append((first, middle, first_length))
+    problem.isGoalState(goal) # lets the display draw the expanded cells
+    return path
+
+def anytimeAStarSearch(problem, heuristic=nullHeuristic, budget=None, weight=3.0, weightStep=0.5):
+    """
+    Anytime Repairing A* (ARA*).  Runs weighted A*, ordering the fringe by
+    g + weight * h, to find a first path quickly, then lowers the weight by
+    weightStep and improves the path until the weight reaches 1 or budget
+    seconds have passed.  budget=None means no time limit, so the last pass
+    is plain A* and the path is optimal for a consistent heuristic.
+
+    Each pass reuses the work of the ones before it: path costs (g values)
+    and search nodes are kept, and only states whose g value dropped after
+    they were expanded (the inconsistent states) are put back on the
+    fringe together with the unexpanded ones.  The budget is checked during
+    a pass too, but a path is always returned if one exists, even if
+    finding the first one takes longer than the budget.
+
+    After every pass statistics.suboptimalityBound is set to a proven bound
+    on cost / optimal cost of the path found so far.
+    """
+    deadline = budget != None and time.time() + budget or None
+    arena = SearchNodeArena()
+    root_state = problem.getStartState()
+    best_g = {root_state: 0}                                           # cheapest path cost found for each state
+    nodes = {root_state: arena.addNode(SearchNodeArena.ROOT, None, 0)} # arena node of that path
+    heu_costs = {}
+
+    def estimate(state):
+        if state not in heu_costs:
+            heu_costs[state] = heuristic(state, problem)
+        return heu_costs[state]
+
+    open_states = set([root_state]) # unexpanded states carried into the next pass
+    incons = set()                  # states improved after their expansion in this pass
+    best_goal = [float('inf'), None] # (cost, state) of the best path found so far
+    counter = 0
+
+    while True:
+        # Rebuild the fringe with the current weight; closed states start over each pass.
+        # The inconsistent states join the open ones, so a pass that stops before
+        # expanding them still keeps them for the next pass and its lower bound
+        open_states |= incons
+        incons = set()
+        fringe = []
+        for state in open_states:
+            heapq.heappush(fringe, (best_g[state] + weight * estimate(state), counter, state))
+            counter += 1
+        closed_set = set()
+        expanded = 0
+        out_of_time = False
+
+        while fringe and fringe[0][0] < best_goal[0]:
+            statistics.noteFringe(len(fringe))
+            (key, _, state) = heapq.heappop(fringe)
+            if state in closed_set or key != best_g[state] + weight * estimate(state):
+                continue # stale entry
+            closed_set.add(state)
+            open_states.discard(state)
+            if problem.isGoalState(state):
+                if best_g[state] < best_goal[0]:
+                    best_goal[0], best_goal[1] = best_g[state], state
+                continue
+            node_cost = best_g[state]
+            for (next_state, action, cost) in problem.getSuccessors(state):
+                next_cost = node_cost + cost
+                if next_state in best_g and best_g[next_state] <= next_cost:
+                    continue
+                best_g[next_state] = next_cost
+                nodes[next_state] = arena.addNode(nodes[state], action, next_cost)
+                if next_state in closed_set:
+                    incons.add(next_state)
+                else:
+                    open_states.add(next_state)
+                    heapq.heappush(fringe, (next_cost + weight * estimate(next_state), counter, next_state))
+                    counter += 1
+            expanded += 1
+            if deadline != None and expanded % 256 == 0 and best_goal[1] != None and time.time() > deadline:
+                out_of_time = True
+                break
+
+        if best_goal[1] == None: # the whole reachable space was searched without a goal
+            return []
+        # Every optimal path runs through a state on the fringe or in incons, so the
+        # smallest g + h among those bounds the optimal cost from below
+        lower = min([best_g[state] + estimate(state) for state in open_states | incons] or [best_goal[0]])
+        if best_goal[0] <= lower:
+            bound = 1.0
+        else:
+            bound = lower > 0 and float(best_goal[0]) / lower or float('inf')
+        if not out_of_time: # a finished pass also guarantees its weight
+            bound = min(bound, weight)
+        statistics.suboptimalityBound = max(1.0, bound)
+        if weight <= 1 or out_of_time or (deadline != None and time.time() > deadline):
             break
-        elif check_node not in closed_set:   # if the state is not already visited, explore and add it to the visited states
-            closed_set.add(check_node) 
-            successor_nodes = problem.getSuccessors(check_node)  #retrieve the  successor states
-            for (node,next_path,cost) in successor_nodes:
-                heu_cost =  heuristic(node, problem)
-                fringe_nodes.push((node,node_path+[next_path],node_cost+cost),node_cost+cost+heu_cost) # add  the  successor states to explore further
+        weight = max(1.0, weight - weightStep)
+
+    return arena.getPath(nodes[best_goal[1]])
+
+
+def idaStarSearch(problem, heuristic=nullHeuristic):
+    """
+    Iterative deepening A*.  Runs depth first searches that cut off every
+    node whose f = g + h exceeds a bound, starting with h(start) and raising
+    the bound to the smallest f that was cut off, until a goal is found.
+
+    Only the current path is kept (as an explicit stack, so deep searches do
+    not hit the recursion limit), so memory grows with the path length
+    instead of the number of states; the price is re-expanding states, both
+    across iterations and when they are reached by different paths.  States
+    already on the current path are skipped.  Optimal for admissible
+    heuristics.
+    """
+    root_state = problem.getStartState()
+    if problem.isGoalState(root_state):
+        return []
+    bound = heuristic(root_state, problem)
+    while True:
+        next_bound = float('inf')    # smallest f that exceeded the bound
+        frames = [(root_state, 0, iter(problem.getSuccessors(root_state)))] # (state, g, successors left)
+        on_path = set([root_state])
+        actions = []                 # actions[i] leads from frames[i] to frames[i + 1]
+        while frames:
+            statistics.noteFringe(len(frames))
+            (state, node_cost, successors) = frames[-1]
+            for (next_state, action, cost) in successors:
+                if next_state in on_path:
+                    continue
+                next_cost = node_cost + cost
+                f = next_cost + heuristic(next_state, problem)
+                if f > bound:
+                    next_bound = min(next_bound, f)
+                    continue
+                actions.append(action)
+                if problem.isGoalState(next_state):
+                    return actions
+                on_path.add(next_state)
+                frames.append((next_state, next_cost, iter(problem.getSuccessors(next_state))))
+                break
+            else: # every successor was tried, back up
+                frames.pop()
+                on_path.discard(state)
+                if frames:
+                    actions.pop()
+        if next_bound == float('inf'): # nothing was cut off, so there is no goal
+            return []
+        bound = next_bound
+
+class SMAStarNode:
+    "A node of the tree smaStarSearch keeps in memory"
+    def __init__(self, state, parent, action, cost, f):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cost = cost
+        self.f = f
+        self.depth = parent and parent.depth + 1 or 0
+        self.children = []
+        self.forgotten = float('inf') # smallest f among children dropped from memory
+        self.alive = True             # False once the node is dropped
+
+    def isLeaf(self):
+        return not self.children
+
+    def getPath(self):
+        path = []
+        node = self
+        while node.parent != None:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+        return path
+
+def smaStarSearch(problem, heuristic=nullHeuristic, memoryLimit=100000):
+    """
+    Simplified memory-bounded A*: A* on a search tree of at most memoryLimit
+    nodes.
+
+    The node with the lowest f (the deepest one on ties) is expanded and
+    all of its successors are generated at once; their f values never drop
+    below their parent's (pathmax).  When the tree outgrows memoryLimit the
+    leaf with the highest f (the shallowest one on ties) is dropped, and its
+    parent remembers the smallest f it forgot, so the parent goes back on
+    the fringe and regenerates the forgotten successors once they look best
+    again.  Every node's f is backed up to the best f below it, so what was
+    learned about a dropped subtree is not lost.
+
+    States already on the path to a node are not generated again, nor are
+    states kept in memory with a path at least as cheap.  A goal more than
+    memoryLimit - 1 steps away cannot be found.  Returns an optimal path
+    for admissible heuristics if one fits in memory, and [] otherwise.
+    """
+    if memoryLimit < 2:
+        raise Exception, 'smaStarSearch needs a memoryLimit of at least 2 nodes'
+    INFINITY = float('inf')
+    root_state = problem.getStartState()
+    root = SMAStarNode(root_state, None, None, 0, heuristic(root_state, problem))
+    best_g = {root_state: root}      # state -> node in memory with the cheapest path to it
+    best_heap, worst_heap = [], []   # entries for the fringe and for the leaves, skipped once stale
+    counter = [0]
+    size = [1]                       # nodes in memory
+
+    def inFringe(node):
+        return node.alive and (node.isLeaf() or node.forgotten < INFINITY)
+
+    def push(node):
+        "Files node under its current f; entries for older f values are skipped when popped"
+        counter[0] += 1
+        if inFringe(node):
+            heapq.heappush(best_heap, (node.f, -node.depth, counter[0], node))
+        if node.alive and node.isLeaf() and node is not root:
+            heapq.heappush(worst_heap, (-node.f, node.depth, counter[0], node))
+        if len(best_heap) + len(worst_heap) > 4 * size[0] + 16:
+            compact()
+        statistics.noteHeapEntries(len(best_heap) + len(worst_heap))
+
+    def compact():
+        "Drops the stale entries from both heaps, so they stay a few times the size of memory"
+        # Only each node's first live entry is kept; the others file it under the same f
+        for (heap, isLive) in [(best_heap, lambda f, node: inFringe(node) and f == node.f),
+                               (worst_heap, lambda neg_f, node: node.alive and node.isLeaf() and -neg_f == node.f)]:
+            first = {}
+            for entry in heap:
+                node = entry[-1]
+                if isLive(entry[0], node) and (node not in first or entry < first[node]):
+                    first[node] = entry
+            heap[:] = first.values()
+            heapq.heapify(heap)
+
+    def backUp(node):
+        "Raises the f values of node and its ancestors to the best f below them"
+        while node != None:
+            if node.isLeaf() and node.forgotten == INFINITY:
+                return # never expanded, or a dead end; its own f stands
+            f = min([child.f for child in node.children] + [node.forgotten])
+            if f <= node.f:
+                return
+            node.f = f
+            push(node)
+            node = node.parent
+
+    def dropWorstLeaf(keep):
+        while worst_heap:
+            (neg_f, _, _, node) = heapq.heappop(worst_heap)
+            if not node.alive or not node.isLeaf() or -neg_f != node.f or node is keep:
+                continue
+            parent = node.parent
+            parent.children.remove(node)
+            parent.forgotten = min(parent.forgotten, node.f)
+            node.alive = False
+            if best_g.get(node.state) is node:
+                del best_g[node.state]
+            size[0] -= 1
+            push(parent)
+            backUp(parent)
+            return True
+        return False
 
-    #print("res",node_path)
-    return node_path
-    util.raiseNotDefined()
+    push(root)
+    while best_heap:
+        (f, _, _, node) = heapq.heappop(best_heap)
+        if not inFringe(node) or f != node.f:
+            continue # stale entry
+        statistics.noteFringe(size[0])
+        if node.f == INFINITY: # nothing in memory leads to a goal
+            return []
+        if problem.isGoalState(node.state):
+            return node.getPath()
+        if node.depth >= memoryLimit - 1: # its successors could never be kept along with their path
+            node.f = INFINITY
+            push(node)
+            backUp(node.parent)
+            continue
 
+        on_path = set()
+        ancestor = node
+        while ancestor != None:
+            on_path.add(ancestor.state)
+            ancestor = ancestor.parent
+        in_memory = set([child.state for child in node.children])
+        node.forgotten = INFINITY # every successor not in memory is generated again below
+        for (state, action, cost) in problem.getSuccessors(node.state):
+            if state in on_path or state in in_memory:
+                continue
+            next_cost = node.cost + cost
+            if state in best_g and best_g[state].cost <= next_cost:
+                continue # a path at least as cheap is already in memory
+            child = SMAStarNode(state, node, action, next_cost,
+                                max(node.f, next_cost + heuristic(state, problem)))
+            node.children.append(child)
+            best_g[state] = child
+            size[0] += 1
+            push(child)
+        if node.isLeaf(): # a dead end
+            node.f = INFINITY
+            push(node)
+            backUp(node.parent)
+        else:
+            backUp(node)
+        while size[0] > memoryLimit and dropWorstLeaf(node):
+            pass
+    return []
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
+greedy = greedySearch
+astarg = aStarBestGSearch
+jps = jumpPointSearch
+bibfs = bidirectionalSearch
+biastar = bidirectionalAStarSearch
+ara = anytimeAStarSearch
+idastar = idaStarSearch
+smastar = smaStarSearch
+hpa = hierarchicalSearch
 ucs = uniformCostSearch
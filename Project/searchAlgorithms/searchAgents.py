@@ -38,6 +38,13 @@ from game import Directions
 from game import Agent
 from game import Actions
 import util
+from array import array
+import hashlib
+import json
+import multiprocessing
+import os
+import Queue
+import sys
 import time
 import search
 
@@ -68,21 +75,35 @@ class SearchAgent(Agent):
     Options for fn include:
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
+      greedySearch or greedy (fast, but the path need not be optimal)
+      jumpPointSearch or jps (PositionSearchProblem with unit costs only)
+      hierarchicalSearch or hpa (PositionSearchProblem with unit costs only)
+      bidirectionalSearch or bibfs, bidirectionalAStarSearch or biastar
+        (problems with a single goal and getReverseSuccessors)
+      anytimeAStarSearch or ara (takes budget, a time limit in seconds)
+      idaStarSearch or idastar
+      smaStarSearch or smastar (takes memoryLimit, the most search nodes kept)
+
+    closed=fingerprint makes dfs, bfs, ucs and astar keep 64 bit state
+    fingerprints in their closed set instead of the states; closed=frontier
+    makes bfs and astar keep no closed set (PositionSearchProblem only).
+    cache=1 reuses plans saved by earlier runs with the same layout and
+    arguments, see PlanCache.
 
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', budget=None, memoryLimit=None, closed=None, cache='0'):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
         if fn not in dir(search):
             raise AttributeError, fn + ' is not a search function in search.py.'
         func = getattr(search, fn)
+        searchArgs = {} # keyword arguments passed on to the search function
         if 'heuristic' not in func.func_code.co_varnames:
             print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
         else:
             if heuristic in globals().keys():
                 heur = globals()[heuristic]
@@ -91,8 +112,27 @@ class SearchAgent(Agent):
             else:
                 raise AttributeError, heuristic + ' is not a function in searchAgents.py or search.py.'
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
-            # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            searchArgs['heuristic'] = heur
+        if budget != None:
+            if 'budget' not in func.func_code.co_varnames:
+                raise AttributeError, fn + ' does not take a time budget.'
+            print('[SearchAgent] using a budget of %s seconds' % budget)
+            searchArgs['budget'] = float(budget)
+        if memoryLimit != None:
+            if 'memoryLimit' not in func.func_code.co_varnames:
+                raise AttributeError, fn + ' does not take a memory limit.'
+            print('[SearchAgent] keeping at most %s search nodes' % memoryLimit)
+            searchArgs['memoryLimit'] = int(memoryLimit)
+        if closed != None:
+            if 'closed' not in func.func_code.co_varnames:
+                raise AttributeError, fn + ' does not take a closed set mode.'
+            print('[SearchAgent] using a closed set of kind ' + closed)
+            searchArgs['closed'] = closed
+        if searchArgs:
+            # Note: this bit of Python trickery combines the search algorithm and its arguments
+            self.searchFunction = lambda x: func(x, **searchArgs)
+        else:
+            self.searchFunction = func
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -100,6 +140,14 @@ class SearchAgent(Agent):
         self.searchType = globals()[prob]
         print('[SearchAgent] using problem type ' + prob)
 
+        # Everything that decides the plan besides the layout, for the plan cache
+        self.searchDescription = repr((fn, prob, heuristic, budget, memoryLimit, closed))
+        if cache not in ['0', '1']:
+            raise AttributeError, 'cache must be 0 or 1, not ' + str(cache)
+        if cache == '1':
+            print('[SearchAgent] using the plan cache in ' + PLAN_CACHE_DIR)
+            self.planCache = PlanCache(PLAN_CACHE_DIR)
+
     def registerInitialState(self, state):
         """
         This is the first time that the agent sees the layout of the game
@@ -112,10 +160,29 @@ class SearchAgent(Agent):
         if self.searchFunction == None: raise Exception, "No search function provided for SearchAgent"
         starttime = time.time()
         problem = self.searchType(state) # Makes a new search problem
-        self.actions  = self.searchFunction(problem) # Find a path
+        search.statistics.reset()
+        # Subclasses that skip SearchAgent.__init__ have no plan cache
+        planCache = getattr(self, 'planCache', None)
+        if planCache != None:
+            description = getattr(self, 'searchDescription', None) or \
+                          repr((self.__class__.__name__, self.searchType.__name__))
+            key = planCache.getKey(state, description)
+            plan = planCache.load(key)
+        if planCache != None and plan != None:
+            self.actions = plan['actions']
+            if '_expanded' in dir(problem): problem._expanded = plan['expanded']
+            print('Path loaded from the plan cache')
+        else:
+            self.actions  = self.searchFunction(problem) # Find a path
+            if planCache != None:
+                planCache.save(key, self.actions, getattr(problem, '_expanded', 0))
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if search.statistics.suboptimalityBound != None:
+            print('Path cost is within %.3f times the optimal cost' % search.statistics.suboptimalityBound)
+        if search.statistics.collisionProbability != None:
+            print('Chance that a fingerprint collision skipped a state: %.2g' % search.statistics.collisionProbability)
 
     def getAction(self, state):
         """
@@ -143,6 +210,7 @@ class PositionSearchProblem(search.SearchProblem):
 
     Note: this search problem is fully specified; you should NOT change it.
     """
+    reversible = True # every move can be undone, so successors are also predecessors
 
     def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
         """
@@ -153,6 +221,7 @@ class PositionSearchProblem(search.SearchProblem):
         goal: A position in the gameState
         """
         self.walls = gameState.getWalls()
+        self.graph = getGridGraph(self.walls)
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
@@ -193,23 +262,44 @@ class PositionSearchProblem(search.SearchProblem):
         """
 
         successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( nextState, action, cost) )
+        graph = self.graph
+        i = graph.cellIndex[state]
+        for k in xrange(graph.offsets[i], graph.offsets[i + 1]):
+            nextState = graph.positions[graph.targets[k]]
+            cost = self.costFn(nextState)
+            successors.append( ( nextState, graph.actions[k], cost) )
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
-        if state not in self._visited:
+        # the visited cells are only drawn, and would hold every expanded state
+        if self.visualize and state not in self._visited:
             self._visited[state] = True
             self._visitedlist.append(state)
 
         return successors
 
+    def getReverseSuccessors(self, state):
+        """
+        Returns the states that reach state in one move, as triples
+        (predecessor, action, stepCost) where action leads from predecessor to
+        state.  Moves on the grid are reversible, so these are the neighbors
+        of state; used by the bidirectional searches in search.py.
+        """
+        predecessors = []
+        cost = self.costFn(state)
+        graph = self.graph
+        i = graph.cellIndex[state]
+        for k in xrange(graph.offsets[i], graph.offsets[i + 1]):
+            predecessors.append( ( graph.positions[graph.targets[k]], graph.reverseActions[k], cost) )
+
+        # Bookkeeping for display purposes, backward expansions count too
+        self._expanded += 1
+        if self.visualize and state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -290,6 +380,35 @@ class CornersProblem(search.SearchProblem):
         "*** YOUR CODE HERE ***"
         #cost per move is 1
         self.move_cost = 1 
+        self.graph = getGridGraph(self.walls)   #legal moves of every open cell, compiled once per layout
+
+        # Tables for cornersHeuristic.  Corner i is bit i of a corner mask.
+        self.cornerBits = dict([(corner, 1 << i) for i, corner in enumerate(self.corners)])
+        # maze distance from every cell to each corner, indexed by GridGraph cell
+        self.cornerDistances = []
+        for corner in self.corners:
+            if self.walls[corner[0]][corner[1]]:   #a walled-in corner can never be reached
+                self.cornerDistances.append(array('l', [-1]) * len(self.graph))
+            else:
+                self.cornerDistances.append(self.graph.distancesFrom(corner))
+        # maze distance between each pair of corners, infinite if one cannot reach the other
+        between = [[float('inf')] * 4 for i in range(4)]
+        for i in range(4):
+            for j, corner in enumerate(self.corners):
+                if corner in self.graph.cellIndex and self.cornerDistances[i][self.graph.cellIndex[corner]] >= 0:
+                    between[i][j] = self.cornerDistances[i][self.graph.cellIndex[corner]]
+        # tourFrom[mask][i]: the shortest walk that starts at corner i and visits every corner in mask
+        self.tourFrom = [[float('inf')] * 4 for mask in range(16)]
+        for mask in range(1, 16):   #subsets come after all of their own subsets
+            for i in range(4):
+                if not mask & (1 << i):
+                    continue
+                rest = mask ^ (1 << i)
+                if not rest:
+                    self.tourFrom[mask][i] = 0
+                    continue
+                self.tourFrom[mask][i] = min([between[i][j] + self.tourFrom[rest][j]
+                                              for j in range(4) if rest & (1 << j)])
 
     def getStartState(self):
         """
@@ -330,28 +449,20 @@ class CornersProblem(search.SearchProblem):
         """
 
         successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            # Add a successor state to the successor list if the action is legal
-            # Here's a code snippet for figuring out whether a new position hits a wall:
-            #   x,y = currentPosition
-            #   dx, dy = Actions.directionToVector(action)
-            #   nextx, nexty = int(x + dx), int(y + dy)
-            #   hitsWall = self.walls[nextx][nexty]
-
-            "*** YOUR CODE HERE ***"
-            ((x, y), _) = state     
-            dx, dy = Actions.directionToVector(action)
-            next_x = int(x + dx)
-            next_y = int(y + dy)
-            hits_wall = self.walls[next_x][next_y] 
-            if not hits_wall:    #check  if the next state is not hitting the wall
-                next_state = (next_x, next_y)   #determine  next  state position
-                cost = self.move_cost  #cost per move is 1
-                (_, corners_to_visit) = state
-                corners_set = set(corners_to_visit)
-                if next_state in corners_set  and next_state in self.corners :   #remove the corners from the set, if the new state is unexplored corner
-                    corners_set.remove(next_state)
-                successors.append( ((next_state, tuple(corners_set)), action, cost) ) #add successors to the succesorslist
+        "*** YOUR CODE HERE ***"
+        (position, corners_to_visit) = state
+        graph = self.graph
+        cell = graph.cellIndex[position]
+        # the legal moves out of this cell, looked up instead of testing walls
+        for k in xrange(graph.offsets[cell], graph.offsets[cell + 1]):
+            next_state = graph.positions[graph.targets[k]]   #determine  next  state position
+            cost = self.move_cost  #cost per move is 1
+            if next_state in corners_to_visit:   #remove the corner, if the new state is unexplored corner
+                # keep the order of the start state so equal sets give equal tuples
+                next_corners = tuple([corner for corner in corners_to_visit if corner != next_state])
+            else:
+                next_corners = corners_to_visit
+            successors.append( ((next_state, next_corners), graph.actions[k], cost) ) #add successors to the succesorslist
 
         self._expanded += 1 # DO NOT CHANGE
         return successors
@@ -387,23 +498,27 @@ def cornersHeuristic(state, problem):
     walls = problem.walls # These are the walls of the maze, as a Grid (game.py)
 
     "*** YOUR CODE HERE ***"
-    corner_farthest = -1 
-    
     (curr_state, explore_corners) = state
 
-   
-    # Heuristic  : Maximum of the manhattan distances to corners yet to be visited.
-
-    for corner in explore_corners:
-        # Update  the farthest corner  location and  also the distance to it
-        if (corner_farthest == -1) or (corner_farthest < util.manhattanDistance(corner, curr_state)): 
-            corner_farthest = util.manhattanDistance(corner, curr_state)
-
     check_count =len(explore_corners) #Check if all conrners are explored
     if (not check_count):
         return 0
 
-    return corner_farthest  
+    # Heuristic : length of the shortest walk from here through every corner yet to be visited,
+    # using the maze distances and corner tours the problem precomputed.  It is the true
+    # remaining cost, so it is admissible and consistent.
+    mask = 0
+    for corner in explore_corners:
+        mask |= problem.cornerBits[corner]
+    cell = problem.graph.cellIndex[curr_state]
+    tours = problem.tourFrom[mask]
+    best_tour = float('inf')
+    for i in range(4):
+        if mask & (1 << i):
+            to_corner = problem.cornerDistances[i][cell]
+            if to_corner >= 0 and to_corner + tours[i] < best_tour:   #skip corners that cannot be reached from here
+                best_tour = to_corner + tours[i]
+    return best_tour
 
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
@@ -423,6 +538,7 @@ class FoodSearchProblem:
     def __init__(self, startingGameState):
         self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
         self.walls = startingGameState.getWalls()
+        self.graph = getGridGraph(self.walls)
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
         self.heuristicInfo = {} # A dictionary for the heuristic to store information
@@ -437,14 +553,13 @@ class FoodSearchProblem:
         "Returns successor states, the actions they require, and a cost of 1."
         successors = []
         self._expanded += 1 # DO NOT CHANGE
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state[0]
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
+        graph = self.graph
+        i = graph.cellIndex[state[0]]
+        for k in xrange(graph.offsets[i], graph.offsets[i + 1]):
+            nextx, nexty = graph.positions[graph.targets[k]]
+            nextFood = state[1].copy()
+            nextFood[nextx][nexty] = False
+            successors.append( ( ((nextx, nexty), nextFood), graph.actions[k], 1) )
         return successors
 
     def getCostOfActions(self, actions):
@@ -461,11 +576,57 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+    def getFoodList(self, state):
+        "Returns the positions of the food remaining in state"
+        return state[1].asList()
+
+class BitmaskFoodSearchProblem(FoodSearchProblem):
+    """
+    A FoodSearchProblem whose states store the remaining food as an integer.
+
+    A search state is a tuple ( pacmanPosition, foodMask ) where bit i of
+    foodMask is set while the i-th dot of the starting layout is uneaten.
+    The position-to-bit tables are built once, so copying, hashing and
+    comparing states and the goal test are integer operations instead of
+    walks over a whole food Grid.
+    """
+    def __init__(self, startingGameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        self.foodPositions = startingGameState.getFood().asList() # bit index -> position
+        self.foodBits = dict([(position, 1 << i) for i, position in enumerate(self.foodPositions)])
+        self.start = (startingGameState.getPacmanPosition(), (1 << len(self.foodPositions)) - 1)
+
+    def isGoalState(self, state):
+        return state[1] == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        successors = []
+        self._expanded += 1 # DO NOT CHANGE
+        position, foodMask = state
+        graph, foodBits = self.graph, self.foodBits
+        i = graph.cellIndex[position]
+        for k in xrange(graph.offsets[i], graph.offsets[i + 1]):
+            nextPosition = graph.positions[graph.targets[k]]
+            nextFood = foodMask & ~foodBits.get(nextPosition, 0)
+            successors.append( ( (nextPosition, nextFood), graph.actions[k], 1) )
+        return successors
+
+    def getFoodList(self, state):
+        "Returns the positions of the food remaining in state"
+        foodList = []
+        foodMask = state[1]
+        while foodMask:
+            lowest = foodMask & -foodMask
+            foodList.append(self.foodPositions[lowest.bit_length() - 1])
+            foodMask ^= lowest
+        return foodList
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
         self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
-        self.searchType = FoodSearchProblem
+        self.searchType = BitmaskFoodSearchProblem
 
 def foodHeuristic(state, problem):
     """
@@ -482,7 +643,9 @@ def foodHeuristic(state, problem):
 
     The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
     (see game.py) of either True or False. You can call foodGrid.asList() to get
-    a list of food coordinates instead.
+    a list of food coordinates instead.  For a BitmaskFoodSearchProblem the
+    second element is an integer bitmask instead of a Grid; the problem's
+    getFoodList(state) returns the food coordinates for either kind.
 
     If you want access to info like walls, capsules, etc., you can query the
     problem.  For example, problem.walls gives you a Grid of where the walls
@@ -497,33 +660,73 @@ def foodHeuristic(state, problem):
     """
     position, foodGrid = state
     "*** YOUR CODE HERE ***"
-
-    # Heuristic used : Maximum of the maze distances to all the food pallets.
+    food_list = problem.getFoodList(state) # works for Grid and bitmask states alike
     #check if food dots are  left
-    if foodGrid.asList(): 
-        food_dist_farthest = -1
-         #Iterate  through all the food dots
-        for food_state in list(foodGrid.asList()): 
-            # Heuristic used : Maximum of the maze distances to all the food pallets.
-            food_dist_farthest = max(food_dist_farthest, mazeDistance(position, food_state, problem.startingGameState))
-        return food_dist_farthest    
+    if not food_list:
+        return 0
 
-    return 0    
+    info = problem.heuristicInfo
+    if 'mazeDistances' not in info: # find the distance table once per problem
+        info['mazeDistances'] = getMazeDistanceTable(problem.walls)
+        info['mstWeights'] = {}
+    table = info['mazeDistances']
+    if table != None:
+        distance = table.getDistance
+    else:
+        distance = lambda xy1, xy2: mazeDistance(xy1, xy2, problem.startingGameState)
+
+    # Heuristic used : maze distance to the closest food pallet plus the weight of a
+    # minimum spanning tree over the remaining pallets.  Any path that eats every pallet
+    # reaches one of them first and then spans the rest, so this never overestimates;
+    # one step changes the first term by at most 1 and eating a pallet lowers the tree
+    # by at most the edge that joined it, so it is consistent as well.
+    # Many states share the same remaining food, so tree weights are memoized per food set.
+    if type(foodGrid) in (int, long):
+        food_key = foodGrid
+    else:
+        food_key = tuple(food_list)
+    mst_weights = info['mstWeights']
+    if food_key not in mst_weights:
+        mst_weights[food_key] = spanningTreeWeight(food_list, distance)
+    return min([distance(position, food_state) for food_state in food_list]) + mst_weights[food_key]
+
+def spanningTreeWeight(points, distance):
+    "Returns the weight of a minimum spanning tree over points, using Prim's algorithm"
+    if len(points) < 2:
+        return 0
+    remaining = list(points[1:])
+    closest = [distance(points[0], point) for point in remaining] # cheapest edge into the tree
+    weight = 0
+    while remaining:
+        i = closest.index(min(closest))
+        weight += closest[i]
+        added = remaining.pop(i)
+        del closest[i]
+        closest = [min(edge, distance(added, point)) for edge, point in zip(closest, remaining)]
+    return weight
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
+        """
+        Plans the whole tour with a ClosestDotPlanner on Pacman's position and
+        the set of remaining dots.  The planner only walks open cells, so the
+        segments are legal by construction and no GameState has to be
+        replayed.  It picks the same dots and paths as repeatedly calling
+        findPathToClosestDot.
+        """
         self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
+        planner = ClosestDotPlanner(state.getWalls())
+        position = planner.cellIndex(state.getPacmanPosition())
+        food = set([planner.cellIndex(dot) for dot in state.getFood().asList()])
+        food.discard(position)
+        while food:
+            nextPathSegment, position = planner.pathToClosest(position, food) # The missing piece
+            if nextPathSegment == None:
+                raise Exception, 'no path from %s to the remaining food' % str(planner.cellPosition(position))
             self.actions += nextPathSegment
-            for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception, 'findPathToClosestDot returned an illegal move: %s!\n%s' % t
-                currentState = currentState.generateSuccessor(0, action)
+            # the segment ends at the closest dot, so no other dot lies on it
+            food.remove(position)
         self.actionIndex = 0
         print 'Path found with cost %d.' % len(self.actions)
 
@@ -542,6 +745,67 @@ class ClosestDotSearchAgent(SearchAgent):
         return(search.bfs(problem))
         util.raiseNotDefined()
 
+class ClosestDotPlanner:
+    """
+    Finds breadth first paths from a cell to the closest cell of a set,
+    reusing one set of arrays for every search on a layout.
+
+    Cells and moves are those of the layout's GridGraph.  Instead of
+    clearing the visited marks between searches, each search takes a new
+    stamp and a cell counts as visited only if it carries the current stamp,
+    so a search touches no more cells than it reaches.  Successors are tried
+    north, south, east, west and goals are tested as they are generated,
+    which finds the same dot and path as search.bfs on an
+    AnyFoodSearchProblem.
+    """
+    def __init__(self, walls):
+        self.graph = getGridGraph(walls)
+        size = len(self.graph)
+        self.stamps = array('l', [0]) * size   # number of the search that last reached a cell
+        self.parents = array('l', [-1]) * size # cell a cell was reached from
+        self.moves = array('l', [0]) * size    # GridGraph move that entered a cell
+        self.stamp = 0
+
+    def cellIndex(self, position):
+        x, y = position
+        return self.graph.cellIndex[(int(x), int(y))]
+
+    def cellPosition(self, cell):
+        return self.graph.positions[cell]
+
+    def pathToClosest(self, start, targets):
+        """
+        Returns (actions, cell) for the closest cell in the set targets, or
+        (None, start) if none can be reached.  start and targets are cell
+        indices.
+        """
+        self.stamp += 1
+        stamp, stamps, parents, moves = self.stamp, self.stamps, self.parents, self.moves
+        offsets, neighbors, actions = self.graph.offsets, self.graph.targets, self.graph.actions
+        stamps[start] = stamp
+        queue = [start]
+        head = 0
+        while head < len(queue):
+            cell = queue[head]
+            head += 1
+            for move in xrange(offsets[cell], offsets[cell + 1]):
+                next = neighbors[move]
+                if stamps[next] == stamp:
+                    continue
+                stamps[next] = stamp
+                parents[next] = cell
+                moves[next] = move
+                if next in targets:
+                    path = []
+                    cell = next
+                    while cell != start:
+                        path.append(actions[moves[cell]])
+                        cell = parents[cell]
+                    path.reverse()
+                    return path, next
+                queue.append(next)
+        return None, start
+
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
     A search problem for finding a path to any food.
@@ -564,8 +828,10 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
+        self.graph = getGridGraph(self.walls)
         self.startState = gameState.getPacmanPosition()
         self.costFn = lambda x: 1
+        self.visualize = False # isGoalState below draws nothing
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
     def isGoalState(self, state):
@@ -576,13 +842,176 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         x,y = state
 
         "*** YOUR CODE HERE ***"
-        food_state_pos= self.food.asList()
-         #if food  dot is found return True
-        if(state in food_state_pos):
-            return 1
-        else:
-            return 0
-        util.raiseNotDefined()
+         #if food  dot is found return True, a Grid lookup instead of building the food list
+        return self.food[x][y]
+
+##############################
+# Compiled layout adjacency  #
+##############################
+
+class GridGraph:
+    """
+    The open cells of a walls Grid and the legal moves between them, compiled
+    once per layout so successor functions look moves up instead of testing
+    walls.
+
+    Cells are numbered in walls.asList(False) order.  The moves out of cell i
+    are entries offsets[i] up to offsets[i+1] of the parallel sequences
+    targets (cell moved to), actions and reverseActions (the action that
+    comes back), in north, south, east, west order -- the order the
+    successor functions always used, so searches expand the same nodes.
+    """
+    def __init__(self, walls):
+        self.positions = walls.asList(False) # cell -> (x, y)
+        self.cellIndex = dict([(position, i) for i, position in enumerate(self.positions)])
+        self.offsets = array('l', [0])
+        self.targets = array('l')
+        self.actions = []
+        self.reverseActions = []
+        for x, y in self.positions:
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(direction)
+                nextx, nexty = int(x + dx), int(y + dy)
+                if 0 <= nextx < walls.width and 0 <= nexty < walls.height and not walls[nextx][nexty]:
+                    self.targets.append(self.cellIndex[(nextx, nexty)])
+                    self.actions.append(direction)
+                    self.reverseActions.append(Directions.REVERSE[direction])
+            self.offsets.append(len(self.targets))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def getNeighbors(self, position):
+        "Returns (neighbor position, action) pairs for the legal moves out of position"
+        i = self.cellIndex[position]
+        return [(self.positions[self.targets[k]], self.actions[k])
+                for k in xrange(self.offsets[i], self.offsets[i + 1])]
+
+    def distancesFrom(self, position):
+        """
+        Returns the maze distance from position to every cell, as an array
+        indexed like self.positions; unreachable cells get -1.
+        """
+        offsets, targets = self.offsets, self.targets
+        distances = array('l', [-1]) * len(self.positions)
+        source = self.cellIndex[position]
+        distances[source] = 0
+        queue = [source]
+        head = 0
+        while head < len(queue):
+            cell = queue[head]
+            head += 1
+            for k in xrange(offsets[cell], offsets[cell + 1]):
+                next = targets[k]
+                if distances[next] < 0:
+                    distances[next] = distances[cell] + 1
+                    queue.append(next)
+        return distances
+
+_gridGraphs = search.WallsCache(lambda walls, key: GridGraph(walls))
+
+def getGridGraph(walls):
+    "Returns the GridGraph for walls, compiling it the first time a layout is seen"
+    return _gridGraphs.get(walls)
+
+########################################
+# Precomputed all-pairs maze distances #
+########################################
+
+MAZE_DISTANCE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.mazeDistanceCache')
+MAX_TABLE_CELLS = 4096 # a full table for this many cells takes 32MB
+
+class MazeDistanceTable:
+    """
+    The maze distance between every pair of non-wall cells of one layout.
+
+    Cells are numbered in walls.asList(False) order and the distances are kept
+    in a flat array of unsigned shorts, row by row, so a lookup is two dict
+    reads and one array index.  The table is filled with one breadth first
+    search per cell and can be saved to and loaded from a file.
+    """
+    UNREACHABLE = 0xFFFF # distance stored for cells in different components
+
+    def __init__(self, walls):
+        self.graph = getGridGraph(walls)
+        self.cells = self.graph.positions
+        self.cellIndex = self.graph.cellIndex
+        self.distances = array('H')
+
+    def getDistance(self, point1, point2):
+        return self.distances[self.cellIndex[point1] * len(self.cells) + self.cellIndex[point2]]
+
+    def getRow(self, point):
+        "Returns the distances from point to every cell, indexed like self.cells"
+        n = len(self.cells)
+        i = self.cellIndex[point]
+        return self.distances[i * n:(i + 1) * n]
+
+    def build(self):
+        "Runs one breadth first search from every cell"
+        n = len(self.cells)
+        offsets, targets = self.graph.offsets, self.graph.targets
+        neighbors = [targets[offsets[cell]:offsets[cell + 1]] for cell in range(n)]
+        distances = array('H', [MazeDistanceTable.UNREACHABLE]) * (n * n)
+        for source in range(n):
+            offset = source * n
+            distances[offset + source] = 0
+            frontier = [source]
+            depth = 0
+            while frontier:
+                depth += 1
+                nextFrontier = []
+                for cell in frontier:
+                    for next in neighbors[cell]:
+                        if distances[offset + next] == MazeDistanceTable.UNREACHABLE:
+                            distances[offset + next] = depth
+                            nextFrontier.append(next)
+                frontier = nextFrontier
+        self.distances = distances
+
+    def save(self, path):
+        "Writes the distances to path, through a temporary file so readers never see half a table"
+        tmpPath = '%s.%d.tmp' % (path, os.getpid())
+        f = open(tmpPath, 'wb')
+        try: self.distances.tofile(f)
+        finally: f.close()
+        os.rename(tmpPath, path)
+
+    def load(self, path):
+        "Reads distances written by save; returns False if the file does not match this layout"
+        n = len(self.cells)
+        if not os.path.exists(path) or os.path.getsize(path) != n * n * self.distances.itemsize:
+            return False
+        distances = array('H')
+        f = open(path, 'rb')
+        try: distances.fromfile(f, n * n)
+        finally: f.close()
+        self.distances = distances
+        return True
+
+def _buildMazeDistanceTable(walls, key):
+    table = MazeDistanceTable(walls)
+    if len(table.cells) > MAX_TABLE_CELLS: return None
+    path = os.path.join(MAZE_DISTANCE_CACHE_DIR, key + '.dist')
+    if not table.load(path):
+        table.build()
+        try:
+            if not os.path.isdir(MAZE_DISTANCE_CACHE_DIR): os.makedirs(MAZE_DISTANCE_CACHE_DIR)
+            table.save(path)
+        except (IOError, OSError), e:
+            print 'Warning: could not save maze distances: ' + str(e)
+    return table
+
+_mazeDistanceTables = search.WallsCache(_buildMazeDistanceTable)
+
+def getMazeDistanceTable(walls):
+    """
+    Returns the MazeDistanceTable for walls, or None if the layout has more
+    than MAX_TABLE_CELLS open cells.  Tables are kept in memory for the run and
+    saved under MAZE_DISTANCE_CACHE_DIR so later runs on the same layout just
+    load them.
+    """
+    return _mazeDistanceTables.get(walls)
 
 def mazeDistance(point1, point2, gameState):
     """
@@ -593,11 +1022,293 @@ def mazeDistance(point1, point2, gameState):
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
     This might be a useful helper function for your ApproximateSearchAgent.
+
+    Distances come from the layout's MazeDistanceTable; only layouts too big
+    for a table fall back to a bidirectional A* per call, guided by
+    landmarkHeuristic.
     """
     x1, y1 = point1
     x2, y2 = point2
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
+    table = getMazeDistanceTable(walls)
+    if table != None:
+        return table.getDistance(point1, point2)
     problem = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(problem))
+    return len(search.bidirectionalAStarSearch(problem, landmarkHeuristic))
+
+#######################################
+# Landmark (ALT) distance lower bounds #
+#######################################
+
+DEFAULT_LANDMARKS = 8
+
+class LandmarkDistances:
+    """
+    Maze distances from a few landmark cells to every cell of a layout, for
+    lower bounds on the distance between any two cells: by the triangle
+    inequality d(a, b) >= |d(L, a) - d(L, b)| for every landmark L.
+
+    Landmarks are chosen farthest point first: the first is the cell
+    farthest from an arbitrary one, and each next one is the cell farthest
+    from all landmarks chosen so far (cells no landmark reaches count as
+    farthest, so every connected part of the maze gets one).  One array of
+    distances is kept per landmark, indexed by GridGraph cell, so memory is
+    K entries per cell.
+    """
+    def __init__(self, walls, numLandmarks=DEFAULT_LANDMARKS):
+        self.graph = getGridGraph(walls)
+        self.landmarks = []
+        self.distances = []
+        n = len(self.graph)
+        if n == 0: return
+        nearest = self.graph.distancesFrom(self.graph.positions[0]) # distance to the closest landmark, -1 if none reaches
+        candidate = max(range(n), key=lambda cell: nearest[cell])
+        for i in range(numLandmarks):
+            landmark = self.graph.positions[candidate]
+            row = self.graph.distancesFrom(landmark)
+            self.landmarks.append(landmark)
+            self.distances.append(row)
+            if i == 0: nearest = array('l', row)
+            else:
+                for cell in xrange(n):
+                    if row[cell] >= 0 and (nearest[cell] < 0 or row[cell] < nearest[cell]):
+                        nearest[cell] = row[cell]
+            # cells no landmark reaches first, then the cell farthest from every landmark
+            candidate = max(range(n), key=lambda cell: nearest[cell] < 0 and n or nearest[cell])
+            if nearest[candidate] == 0: # every cell is a landmark
+                break
+
+    def lowerBound(self, point1, point2):
+        "A lower bound on the maze distance between two cells; infinite if they are not connected"
+        i, j = self.graph.cellIndex[point1], self.graph.cellIndex[point2]
+        bound = 0
+        for row in self.distances:
+            d1, d2 = row[i], row[j]
+            if (d1 < 0) != (d2 < 0):
+                return float('inf') # the landmark reaches one cell but not the other
+            if abs(d1 - d2) > bound:
+                bound = abs(d1 - d2)
+        return bound
+
+_landmarkDistances = search.WallsCache(lambda walls, key: {}) # layout -> {number of landmarks: LandmarkDistances}
+
+def getLandmarkDistances(walls, numLandmarks=DEFAULT_LANDMARKS):
+    "Returns the LandmarkDistances for walls, computing them once per layout"
+    tables = _landmarkDistances.get(walls)
+    if numLandmarks not in tables:
+        tables[numLandmarks] = LandmarkDistances(walls, numLandmarks)
+    return tables[numLandmarks]
+
+def makeLandmarkHeuristic(walls, numLandmarks=DEFAULT_LANDMARKS):
+    """
+    Returns an ALT heuristic for position states on walls, built on
+    numLandmarks landmarks.  It bounds the distance to problem.goal, or for
+    an AnyFoodSearchProblem to the closest remaining dot.  It is admissible
+    and consistent when every step costs 1.
+    """
+    landmarks = getLandmarkDistances(walls, numLandmarks)
+    foodCache = [None, []] # the last food Grid seen and its dots, as asList is slow
+
+    def heuristic(position, problem):
+        if hasattr(problem, 'goal'):
+            return landmarks.lowerBound(position, problem.goal)
+        if problem.food is not foodCache[0]:
+            foodCache[0], foodCache[1] = problem.food, problem.food.asList()
+        return min([landmarks.lowerBound(position, dot) for dot in foodCache[1]] or [0])
+    return heuristic
+
+_landmarkHeuristics = search.WallsCache(lambda walls, key: makeLandmarkHeuristic(walls))
+
+def landmarkHeuristic(position, problem):
+    "The ALT heuristic with DEFAULT_LANDMARKS landmarks for a PositionSearchProblem or AnyFoodSearchProblem"
+    return _landmarkHeuristics.get(problem.walls)(position, problem)
+
+#########################
+# Persistent plan cache #
+#########################
+
+PLAN_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.planCache')
+
+_sourceVersion = []
+
+def sourceVersion():
+    "Returns a digest of search.py and searchAgents.py, so plans are dropped when the code changes"
+    if not _sourceVersion:
+        digest = hashlib.sha1()
+        for module in [search, sys.modules[__name__]]:
+            path = os.path.splitext(module.__file__)[0] + '.py'
+            f = open(path, 'rb')
+            try: digest.update(f.read())
+            finally: f.close()
+        _sourceVersion.append(digest.hexdigest())
+    return _sourceVersion[0]
+
+def layoutKey(gameState):
+    """
+    Returns a digest of everything in gameState a search problem can start
+    from: the walls, food, capsules, Pacman's position and the ghosts'.
+    """
+    food = ''.join([dot and '1' or '0' for column in gameState.getFood().data for dot in column])
+    parts = [search.wallsKey(gameState.getWalls()), food, repr(gameState.getPacmanPosition()),
+             repr(sorted(gameState.getCapsules())), repr(gameState.getGhostPositions())]
+    return hashlib.sha1('|'.join(parts)).hexdigest()
+
+class PlanCache:
+    """
+    Saves the plans of SearchAgent in a directory, one JSON file per plan
+    holding its actions and expansion count.  A plan's file is named by a
+    digest of the layout (layoutKey), the agent's search arguments and the
+    version of the search code (sourceVersion), so changing any of them
+    just misses the cache.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def getKey(self, gameState, description):
+        return hashlib.sha1('%s|%s|%s' % (layoutKey(gameState), description, sourceVersion())).hexdigest()
+
+    def load(self, key):
+        "Returns the saved plan for key as a dict with 'actions' and 'expanded', or None"
+        path = os.path.join(self.directory, key + '.json')
+        if not os.path.exists(path):
+            return None
+        try:
+            f = open(path)
+            try: plan = json.load(f)
+            finally: f.close()
+            return {'actions': [str(action) for action in plan['actions']], 'expanded': plan['expanded']}
+        except (IOError, ValueError, KeyError, TypeError):
+            return None # unreadable, it gets replaced
+
+    def save(self, key, actions, expanded):
+        "Writes a plan through a temporary file so readers never see half of one"
+        path = os.path.join(self.directory, key + '.json')
+        tmpPath = '%s.%d.tmp' % (path, os.getpid())
+        try:
+            if not os.path.isdir(self.directory): os.makedirs(self.directory)
+            f = open(tmpPath, 'w')
+            try: json.dump({'actions': actions, 'expanded': expanded}, f)
+            finally: f.close()
+            os.rename(tmpPath, path)
+        except (IOError, OSError), e:
+            print 'Warning: could not save the plan: ' + str(e)
+
+#############################
+# Parallel search portfolio #
+#############################
+
+DEFAULT_PORTFOLIO = 'greedySearch:manhattanHeuristic;aStarSearch:manhattanHeuristic;' \
+                    'aStarSearch:euclideanHeuristic;uniformCostSearch'
+
+def _runPortfolioMember(queue, index, searchFunction, searchType, state):
+    "Runs one portfolio member in a worker process; puts (index, actions, expanded, error) on queue"
+    import __main__
+    if '_display' in dir(__main__):
+        del __main__._display # the window belongs to the parent process
+    try:
+        problem = searchType(state)
+        actions = searchFunction(problem)
+        queue.put((index, actions, getattr(problem, '_expanded', 0), None))
+    except Exception, e:
+        queue.put((index, None, 0, '%s: %s' % (e.__class__.__name__, e)))
+
+def replayPlan(problem, actions):
+    """
+    Returns the cost of following actions from the start state of problem,
+    or None if some action is not legal or the last state is not a goal.
+    """
+    if actions == None: return None
+    state = problem.getStartState()
+    cost = 0
+    for action in actions:
+        steps = [(next_state, step_cost) for (next_state, next_action, step_cost)
+                 in problem.getSuccessors(state) if next_action == action]
+        if not steps: return None
+        (state, step_cost) = steps[0]
+        cost += step_cost
+    if not problem.isGoalState(state): return None
+    return cost
+
+class PortfolioSearchAgent(SearchAgent):
+    """
+    Runs several search configurations at once, each in its own worker
+    process, and follows the plan of the one that wins.
+
+    configs lists the members separated by ';', each a search function
+    followed by ':' and a heuristic if it takes one (-a already splits on
+    commas, so quote the argument for the shell).  mode=first follows the
+    first valid plan to come back; mode=best waits until deadline seconds
+    have passed or every member is done, and follows the cheapest valid
+    plan.  If no plan is back by the deadline the first valid one after it
+    is taken.  Members still running are then terminated.
+
+    > python pacman.py -l bigMaze -p PortfolioSearchAgent -a mode=best,deadline=5
+    """
+
+    def __init__(self, configs=DEFAULT_PORTFOLIO, prob='PositionSearchProblem', mode='first', deadline='10'):
+        if mode not in ['first', 'best']:
+            raise AttributeError, 'mode must be first or best, not ' + str(mode)
+        self.mode = mode
+        self.deadline = float(deadline)
+        self.members = [] # (configuration, search function) per member
+        for config in configs.split(';'):
+            names = config.split(':')
+            if len(names) > 2:
+                raise AttributeError, config + ' is not a search function with an optional heuristic.'
+            # SearchAgent checks the names and binds the heuristic for us
+            member = SearchAgent(names[0], prob, (names[1:] or ['nullHeuristic'])[0])
+            self.members.append((config, member.searchFunction))
+        self.searchType = member.searchType
+        print('[PortfolioSearchAgent] running %d members, mode %s, deadline %s seconds' % (len(self.members), mode, deadline))
+
+    def registerInitialState(self, state):
+        starttime = time.time()
+        problem = self.searchType(state) # only used to check the plans that come back
+        queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_runPortfolioMember,
+                                           args=(queue, index, searchFunction, self.searchType, state))
+                   for (index, (config, searchFunction)) in enumerate(self.members)]
+        best = None # (cost, index, actions, expanded) of the best valid plan so far
+        running = len(workers)
+        try:
+            for worker in workers: worker.start()
+            while running > 0:
+                elapsed = time.time() - starttime
+                if best != None and (self.mode == 'first' or elapsed >= self.deadline):
+                    break
+                if best == None:
+                    wait = 1.0 # keep checking that some member is still alive
+                else:
+                    wait = self.deadline - elapsed
+                try:
+                    (index, actions, expanded, error) = queue.get(timeout=wait)
+                except Queue.Empty:
+                    if not [worker for worker in workers if worker.is_alive()] and queue.empty():
+                        break # every member died without an answer
+                    continue
+                running -= 1
+                config = self.members[index][0]
+                if error != None:
+                    print('[PortfolioSearchAgent] %s failed: %s' % (config, error))
+                    continue
+                cost = replayPlan(problem, actions)
+                if cost == None:
+                    print('[PortfolioSearchAgent] %s returned an invalid plan' % config)
+                    continue
+                print('[PortfolioSearchAgent] %s: cost %s, %d nodes expanded, after %.1f seconds' % (
+                    config, cost, expanded, time.time() - starttime))
+                if best == None or (cost, index) < best[:2]:
+                    best = (cost, index, actions, expanded)
+        finally:
+            for worker in workers:
+                if worker.is_alive(): worker.terminate()
+                worker.join()
+        if best == None:
+            raise Exception, 'No member of the portfolio found a plan'
+        (totalCost, index, self.actions, expanded) = best
+        if '_expanded' in dir(problem): problem._expanded = expanded
+        print('Path found by %s with total cost of %d in %.1f seconds' % (
+            self.members[index][0], totalCost, time.time() - starttime))
+        print('Search nodes expanded: %d' % expanded)
@@ -0,0 +1,362 @@
+# searchBenchmark.py
+# ------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Runs the search functions in search.py over the search problems in
+searchAgents.py without a display and records, for every run, the path
+cost, the nodes expanded, the largest fringe, the wall time and the peak
+resident memory.  Results can be written as JSON and CSV and compared
+against a stored JSON baseline.  For example:
+
+> python searchBenchmark.py --json baseline.json
+> python searchBenchmark.py -a bfs,astar --baseline baseline.json --threshold 0.1
+> python searchBenchmark.py --randomMazes 1000
+
+Each run happens in its own process, so peak memory and the caches built
+by one run do not leak into the next.  The exit status is 1 if any
+regression was found.
+
+--randomMazes instead checks, on that many random mazes, that the searches
+in RANDOM_MAZE_CHECKS find paths exactly as cheap as uniformCostSearch, and
+that smaStarSearch with only SMA_SPARE_NODES nodes of memory to spare does
+too, without its heaps growing past SMA_HEAP_ENTRIES_PER_NODE entries per
+node of memory.
+"""
+
+from optparse import OptionParser
+import csv
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import time
+
+import layout
+import pacman
+import search
+import searchAgents
+
+# Algorithms as (name in the results, search function in search.py)
+ALGORITHMS = [
+    ('dfs', 'depthFirstSearch'),
+    ('bfs', 'breadthFirstSearch'),
+    ('ucs', 'uniformCostSearch'),
+    ('astar', 'aStarSearch'),
+    ('greedy', 'greedySearch'),
+    ('astarg', 'aStarBestGSearch'),
+    ('jps', 'jumpPointSearch'),
+    ('bibfs', 'bidirectionalSearch'),
+    ('biastar', 'bidirectionalAStarSearch'),
+    ('ara', 'anytimeAStarSearch'),
+    ('idastar', 'idaStarSearch'),
+    ('smastar', 'smaStarSearch'),
+    ('hpa', 'hierarchicalSearch'),
+]
+
+# Algorithms that need a problem with a single goal and getReverseSuccessors
+SINGLE_GOAL_ALGORITHMS = ['jps', 'bibfs', 'biastar', 'hpa']
+
+# Problems as (problem class in searchAgents.py, heuristic for A*, default layouts)
+PROBLEMS = [
+    ('PositionSearchProblem', 'manhattanHeuristic', ['tinyMaze', 'mediumMaze', 'bigMaze', 'openMaze']),
+    ('CornersProblem', 'cornersHeuristic', ['tinyCorners', 'mediumCorners']),
+    ('FoodSearchProblem', 'foodHeuristic', ['tinySearch', 'trickySearch']),
+    ('BitmaskFoodSearchProblem', 'foodHeuristic', ['tinySearch', 'trickySearch']),
+    ('AnyFoodSearchProblem', 'nullHeuristic', ['mediumMaze', 'trickySearch']),
+]
+
+FIELDS = ['problem', 'layout', 'algorithm', 'heuristic', 'cost', 'pathLength',
+          'expanded', 'maxFringe', 'seconds', 'peakRSSKB', 'error']
+
+# Measurements compared against the baseline, and the smallest absolute
+# increase that counts, so timer noise on tiny runs is not flagged
+MEASUREMENTS = [('expanded', 0), ('maxFringe', 0), ('seconds', 0.05), ('peakRSSKB', 1024)]
+
+def makeProblem(problemName, gameState):
+    "Builds the named problem from searchAgents.py without any display bookkeeping"
+    if problemName == 'PositionSearchProblem':
+        return searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+    return getattr(searchAgents, problemName)(gameState)
+
+def isApplicable(algorithm, problem):
+    if algorithm in SINGLE_GOAL_ALGORITHMS:
+        return 'goal' in dir(problem) and 'getReverseSuccessors' in dir(problem)
+    return True
+
+def runCase(problemName, heuristicName, layoutName, algorithm, functionName):
+    """
+    Runs one search and returns its measurements as a dict with the keys in
+    FIELDS, or None if the algorithm does not apply to the problem.
+    """
+    lay = layout.getLayout(layoutName)
+    if lay == None: raise Exception("The layout " + layoutName + " cannot be found")
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    problem = makeProblem(problemName, gameState)
+    if not isApplicable(algorithm, problem):
+        return None
+    func = getattr(search, functionName)
+    usesHeuristic = 'heuristic' in func.func_code.co_varnames
+
+    search.statistics.reset()
+    start = time.time()
+    if usesHeuristic:
+        heuristic = getattr(searchAgents, heuristicName, None) or getattr(search, heuristicName)
+        actions = func(problem, heuristic=heuristic)
+    else:
+        actions = func(problem)
+    seconds = time.time() - start
+
+    return {'problem': problemName, 'layout': layoutName, 'algorithm': algorithm,
+            'heuristic': usesHeuristic and heuristicName or '',
+            'cost': problem.getCostOfActions(actions), 'pathLength': len(actions),
+            'expanded': problem._expanded, 'maxFringe': search.statistics.maxFringe,
+            'seconds': round(seconds, 4),
+            'peakRSSKB': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'error': ''}
+
+def _runInChild(queue, args):
+    try:
+        queue.put(runCase(*args))
+    except Exception, e:
+        queue.put({'error': '%s: %s' % (e.__class__.__name__, e)})
+
+def runIsolated(args, timeout):
+    "Runs runCase(*args) in a fresh process; gives up after timeout seconds"
+    queue = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=_runInChild, args=(queue, args))
+    worker.start()
+    try:
+        result = queue.get(timeout=timeout)
+    except Exception:
+        result = {'error': 'timed out after %d seconds' % timeout}
+    worker.join(1)
+    if worker.is_alive():
+        worker.terminate()
+    return result
+
+def runBenchmark(problems, algorithms, layouts=None, timeout=300, isolate=True):
+    results = []
+    for (problemName, heuristicName, defaultLayouts) in problems:
+        for layoutName in layouts or defaultLayouts:
+            for (algorithm, functionName) in algorithms:
+                args = (problemName, heuristicName, layoutName, algorithm, functionName)
+                if isolate:
+                    result = runIsolated(args, timeout)
+                else:
+                    try: result = runCase(*args)
+                    except Exception, e: result = {'error': '%s: %s' % (e.__class__.__name__, e)}
+                if result == None: continue # the algorithm does not apply here
+                if result['error']:
+                    result.update({'problem': problemName, 'layout': layoutName, 'algorithm': algorithm})
+                results.append(result)
+                printResult(result)
+    return results
+
+def printResult(result):
+    if result['error']:
+        print '%-25s %-14s %-8s ERROR %s' % (result['problem'], result['layout'], result['algorithm'], result['error'])
+    else:
+        print '%-25s %-14s %-8s cost %6s  expanded %8d  fringe %7d  %8.3fs  %8d KB' % (
+            result['problem'], result['layout'], result['algorithm'], result['cost'],
+            result['expanded'], result['maxFringe'], result['seconds'], result['peakRSSKB'])
+
+def compareToBaseline(results, baseline, threshold):
+    """
+    Returns a list of messages, one per regression: a run whose path got
+    more expensive, or whose measurements grew by more than threshold (a
+    fraction) over the baseline run of the same problem, layout and
+    algorithm.
+    """
+    previous = {}
+    for result in baseline:
+        previous[(result['problem'], result['layout'], result['algorithm'])] = result
+    regressions = []
+    for result in results:
+        key = (result['problem'], result['layout'], result['algorithm'])
+        if key not in previous or result['error'] or previous[key].get('error'):
+            continue
+        old = previous[key]
+        name = '%s/%s/%s' % key
+        if result['cost'] > old['cost']:
+            regressions.append('%s: cost %s -> %s' % (name, old['cost'], result['cost']))
+        for (field, slack) in MEASUREMENTS:
+            increase = result[field] - old[field]
+            if increase > slack and increase > threshold * old[field]:
+                regressions.append('%s: %s %s -> %s (+%.0f%%)' % (name, field, old[field], result[field],
+                                   100.0 * increase / max(old[field], 1)))
+    return regressions
+
+def writeResults(results, jsonPath=None, csvPath=None):
+    if jsonPath:
+        f = open(jsonPath, 'w')
+        try: json.dump(results, f, indent=1, sort_keys=True)
+        finally: f.close()
+    if csvPath:
+        f = open(csvPath, 'wb')
+        try:
+            writer = csv.DictWriter(f, FIELDS, extrasaction='ignore')
+            writer.writerow(dict(zip(FIELDS, FIELDS)))
+            writer.writerows(results)
+        finally: f.close()
+
+def selectByName(entries, names, kind):
+    if not names: return entries
+    names = names.split(',')
+    for name in names:
+        if name not in [entry[0] for entry in entries]:
+            raise Exception('Unknown %s %s; choose from %s' % (kind, name, ', '.join([entry[0] for entry in entries])))
+    return [entry for entry in entries if entry[0] in names]
+
+# Searches that must find optimal paths, checked against uniformCostSearch by
+# checkRandomMazes, as (name, search function, keyword arguments)
+RANDOM_MAZE_CHECKS = [
+    ('astarg', 'aStarBestGSearch', {}),
+    ('jps', 'jumpPointSearch', {}),
+    ('bibfs', 'bidirectionalSearch', {}),
+    ('biastar', 'bidirectionalAStarSearch', {}),
+    ('ara', 'anytimeAStarSearch', {}),
+    ('idastar', 'idaStarSearch', {}),
+    ('bfs-frontier', 'breadthFirstSearch', {'closed': 'frontier'}),
+    ('astar-frontier', 'aStarSearch', {'closed': 'frontier'}),
+    ('bfs-fingerprint', 'breadthFirstSearch', {'closed': 'fingerprint'}),
+    ('astar-fingerprint', 'aStarSearch', {'closed': 'fingerprint'}),
+]
+SMA_SPARE_NODES = 6 # memoryLimit of the smaStarSearch check, beyond the path itself
+SMA_HEAP_ENTRIES_PER_NODE = 8 # most heap entries it may hold per node of memoryLimit
+
+def randomMaze(width, height, rand, braid):
+    """
+    Returns the rows of a random maze layout of width x height cells, carved
+    by a depth first walk, with a braid fraction of the inner walls knocked
+    out so there are loops, and Pacman and one food dot on random cells.
+    """
+    grid = [['%'] * (2 * width + 1) for y in range(2 * height + 1)]
+    grid[1][1] = ' '
+    stack = [(0, 0)]
+    seen = set(stack)
+    while stack:
+        (x, y) = stack[-1]
+        neighbors = [(x + dx, y + dy) for (dx, dy) in [(1, 0), (-1, 0), (0, 1), (0, -1)]
+                     if 0 <= x + dx < width and 0 <= y + dy < height and (x + dx, y + dy) not in seen]
+        if not neighbors:
+            stack.pop()
+            continue
+        (nx, ny) = rand.choice(neighbors)
+        seen.add((nx, ny))
+        grid[2 * ny + 1][2 * nx + 1] = ' '
+        grid[y + ny + 1][x + nx + 1] = ' '
+        stack.append((nx, ny))
+    for row in grid[1:-1]:
+        for x in range(1, len(row) - 1):
+            if row[x] == '%' and rand.random() < braid:
+                row[x] = ' '
+    cells = [(x, y) for y in range(len(grid)) for x in range(len(grid[0])) if grid[y][x] == ' ']
+    (pacman_cell, food_cell) = rand.sample(cells, 2)
+    grid[pacman_cell[1]][pacman_cell[0]] = 'P'
+    grid[food_cell[1]][food_cell[0]] = '.'
+    return [''.join(row) for row in grid]
+
+def checkRandomMazes(count, seed=0):
+    """
+    Runs uniformCostSearch, every search in RANDOM_MAZE_CHECKS and a
+    memory-starved smaStarSearch on count random mazes from Pacman to the
+    food dot, and returns a list of messages, one per path that cost more
+    than uniformCostSearch's and one per smaStarSearch run whose heaps grew
+    too large.
+    """
+    rand = random.Random(seed)
+    failures = []
+    for trial in range(count):
+        rows = randomMaze(rand.randint(3, 12), rand.randint(3, 12), rand, rand.random() * 0.4)
+        gameState = pacman.GameState()
+        gameState.initialize(layout.Layout(rows), 0)
+        goal = gameState.getFood().asList()[0]
+        makeProblem = lambda: searchAgents.PositionSearchProblem(gameState, goal=goal, warn=False, visualize=False)
+        optimal = len(search.uniformCostSearch(makeProblem()))
+        for (algorithm, functionName, keywords) in RANDOM_MAZE_CHECKS:
+            problem = makeProblem()
+            search.statistics.reset()
+            func = getattr(search, functionName)
+            if 'heuristic' in func.func_code.co_varnames:
+                actions = func(problem, heuristic=searchAgents.manhattanHeuristic, **keywords)
+            else:
+                actions = func(problem, **keywords)
+            cost = problem.getCostOfActions(actions)
+            if cost != optimal:
+                failures.append('maze %d (seed %d): %s found cost %s, uniformCostSearch %s' % (
+                    trial, seed, algorithm, cost, optimal))
+        # With little memory to spare, SMA* keeps dropping and regenerating nodes
+        memoryLimit = optimal + SMA_SPARE_NODES
+        problem = makeProblem()
+        search.statistics.reset()
+        actions = search.smaStarSearch(problem, searchAgents.manhattanHeuristic, memoryLimit=memoryLimit)
+        cost = problem.getCostOfActions(actions)
+        if cost != optimal:
+            failures.append('maze %d (seed %d): smastar found cost %s, uniformCostSearch %s' % (
+                trial, seed, cost, optimal))
+        if search.statistics.maxHeapEntries > SMA_HEAP_ENTRIES_PER_NODE * memoryLimit:
+            failures.append('maze %d (seed %d): smastar heaps held %d entries with memoryLimit %d' % (
+                trial, seed, search.statistics.maxHeapEntries, memoryLimit))
+    return failures
+
+def readCommand(argv):
+    parser = OptionParser('USAGE: python searchBenchmark.py <options>')
+    parser.add_option('-a', '--algorithms', dest='algorithms', default=None,
+                      help='comma separated algorithms to run [Default: all]')
+    parser.add_option('-p', '--problems', dest='problems', default=None,
+                      help='comma separated problem classes to run [Default: all]')
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='comma separated layouts to use for every problem [Default: per problem]')
+    parser.add_option('--json', dest='json', default=None, help='write the results to this JSON file')
+    parser.add_option('--csv', dest='csv', default=None, help='write the results to this CSV file')
+    parser.add_option('--baseline', dest='baseline', default=None, help='compare against this JSON file')
+    parser.add_option('--threshold', dest='threshold', type='float', default=0.2,
+                      help='fractional increase that counts as a regression [Default: %default]')
+    parser.add_option('--timeout', dest='timeout', type='int', default=300,
+                      help='seconds allowed per run [Default: %default]')
+    parser.add_option('--inProcess', dest='isolate', action='store_false', default=True,
+                      help='run everything in this process (peak memory is then cumulative)')
+    parser.add_option('--randomMazes', dest='randomMazes', type='int', default=0,
+                      help='only check optimal searches against ucs on this many random mazes')
+    parser.add_option('--seed', dest='seed', type='int', default=0,
+                      help='random seed for --randomMazes [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    if options.randomMazes:
+        failures = checkRandomMazes(options.randomMazes, options.seed)
+        for failure in failures:
+            print 'FAILURE ' + failure
+        print '%d failure(s) on %d random mazes' % (len(failures), options.randomMazes)
+        sys.exit(failures and 1 or 0)
+    algorithms = selectByName(ALGORITHMS, options.algorithms, 'algorithm')
+    problems = selectByName(PROBLEMS, options.problems, 'problem')
+    layouts = options.layouts and options.layouts.split(',') or None
+    results = runBenchmark(problems, algorithms, layouts, options.timeout, options.isolate)
+    writeResults(results, options.json, options.csv)
+    if options.baseline:
+        f = open(options.baseline)
+        try: baseline = json.load(f)
+        finally: f.close()
+        regressions = compareToBaseline(results, baseline, options.threshold)
+        for regression in regressions:
+            print 'REGRESSION ' + regression
+        print '%d regression(s) against %s' % (len(regressions), options.baseline)
+        if regressions: sys.exit(1)